@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Qt 없이 동작한다 (작업 프로세스에서 불린다)
+from CsvIOlib import CsvReader, fileKey
+from Compliancelib import PASS, FAIL, REPORT_CODE, REPORT_ITEM, REPORT_SEVERITY, REPORT_RESULT
+from SortKeylib import naturalKeys
+
+SEVERITIES = ['상', '중', '하']
+# 점검결과 칸: 취약, 양호, 그 밖(빈 값 등 미점검)
+RESULTS = [FAIL, PASS]
+UNCHECKED = len(RESULTS)
+COLUMNS = [REPORT_CODE, REPORT_ITEM, REPORT_SEVERITY, REPORT_RESULT]
+
+
+def hostName(fileName):
+    # 보고서 파일 하나가 호스트 하나다
+    return os.path.splitext(os.path.basename(fileName))[0]
+
+
+def hostNames(fileNames):
+    # 파일 -> 호스트 이름. 이름이 겹치면 (siteA/web01.csv, siteB/web01.csv) 그 파일들의 공통 폴더 기준 상대 경로로 구분한다
+    names = {fileName: hostName(fileName) for fileName in fileNames}
+    groups = dict()
+    for fileName, name in names.items():
+        groups.setdefault(name, []).append(fileName)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        paths = [os.path.abspath(fileName) for fileName in group]
+        root = os.path.commonpath([os.path.dirname(path) for path in paths])
+        labels = [os.path.splitext(os.path.relpath(path, root))[0] for path in paths]
+        if len(set(labels)) < len(labels):
+            # 같은 폴더의 web01.csv, web01.txt 처럼 확장자만 다르면 확장자까지 쓴다
+            labels = [os.path.relpath(path, root) for path in paths]
+        names.update(zip(group, labels))
+    return names
+
+
+def readReport(task):
+    # 작업 프로세스: 파일 하나를 (항목코드, 점검항목, 중요도, 점검결과) 별 행 수로 줄여서 돌려준다
+    fileName, useCache = task
+    key = fileKey(fileName)
+    df = CsvReader(fileName, useCache=useCache).read()
+    missing = [column for column in COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError('missing columns: %s' % ', '.join(missing))
+    frame = pd.DataFrame({column: df[column].astype(object).where(df[column].notna(), '').astype(str).str.strip()
+                          for column in COLUMNS})
+    counts = frame.groupby(COLUMNS, sort=False).size().reset_index(name='count')
+    return fileName, key, counts
+
+
+class Pivot(object):
+    # 항목 x 호스트 x (취약, 양호, 미점검) 행 수
+    def __init__(self, items, hosts, counts):
+        self.items = items
+        self.hosts = hosts
+        self.counts = counts
+
+
+class ReportStore(object):
+    # 파일마다 줄인 행 수 표를 보관하고, 바뀐(mtime, size) 파일만 다시 읽는다
+    def __init__(self, useCache=True):
+        self.useCache = useCache
+        self.parts = dict()
+        self.errors = dict()
+        self._table = None
+
+    def refresh(self, fileNames, executor=None):
+        fileNames = list(dict.fromkeys(fileNames))
+        removed = [fileName for fileName in self.parts if fileName not in fileNames]
+        for fileName in removed:
+            del self.parts[fileName]
+        stale = []
+        for fileName in fileNames:
+            try:
+                key = fileKey(fileName)
+            except OSError as e:
+                self.parts.pop(fileName, None)
+                self.errors[fileName] = '%s: %s' % (type(e).__name__, e)
+                continue
+            if fileName not in self.parts or self.parts[fileName][0] != key:
+                stale.append(fileName)
+        if stale:
+            owned = executor is None
+            if owned:
+                executor = ProcessPoolExecutor()
+            try:
+                futures = [(fileName, executor.submit(readReport, (fileName, self.useCache))) for fileName in stale]
+                for fileName, future in futures:
+                    try:
+                        _, key, counts = future.result()
+                    except Exception as e:
+                        self.parts.pop(fileName, None)
+                        self.errors[fileName] = '%s: %s' % (type(e).__name__, e)
+                    else:
+                        self.parts[fileName] = (key, counts)
+                        self.errors.pop(fileName, None)
+            finally:
+                if owned:
+                    executor.shutdown()
+        if stale or removed:
+            self._table = None
+        return stale, removed
+
+    def table(self):
+        # 호스트, 항목코드를 열로 가진 하나의 열 저장소 (호스트는 파일 이름 순의 범주형)
+        if self._table is None:
+            fileNames = sorted(self.parts)
+            names = hostNames(fileNames)
+            hosts = [names[fileName] for fileName in fileNames]
+            frames = [self.parts[fileName][1].assign(host=host) for fileName, host in zip(fileNames, hosts)]
+            if frames:
+                table = pd.concat(frames, ignore_index=True)
+            else:
+                table = pd.DataFrame({column: pd.Series(dtype=object) for column in COLUMNS + ['host']})
+                table['count'] = pd.Series(dtype=np.int64)
+            table['host'] = pd.Categorical(table['host'], categories=hosts)
+            self._table = table
+        return self._table
+
+    def pivot(self, severities=None):
+        table = self.table()
+        if severities:
+            table = table[table[REPORT_SEVERITY].isin(severities).to_numpy()]
+        # 항목은 항목코드 자연 정렬 순, 점검항목과 중요도는 처음 나온 값을 쓴다
+        codes, uniques = pd.factorize(table[REPORT_CODE].to_numpy(dtype=object))
+        order = np.argsort(naturalKeys(uniques), kind='stable')
+        position = np.empty(len(uniques), dtype=np.intp)
+        position[order] = np.arange(len(uniques))
+        rows = position[codes]
+        first = pd.Series(np.arange(len(rows))).groupby(rows).first().to_numpy()
+        items = pd.DataFrame({REPORT_CODE: uniques[order],
+                              REPORT_ITEM: table[REPORT_ITEM].to_numpy(dtype=object)[first],
+                              REPORT_SEVERITY: table[REPORT_SEVERITY].to_numpy(dtype=object)[first]})
+        hosts = list(table['host'].cat.categories)
+        results = pd.Index(RESULTS).get_indexer(table[REPORT_RESULT].to_numpy(dtype=object))
+        results[results < 0] = UNCHECKED
+        counts = np.zeros((len(items.index), len(hosts), UNCHECKED + 1), dtype=np.int64)
+        np.add.at(counts, (rows, table['host'].cat.codes.to_numpy(), results), table['count'].to_numpy())
+        return Pivot(items, hosts, counts)
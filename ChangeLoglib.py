@@ -0,0 +1,132 @@
+import os
+import json
+import tempfile
+
+from CsvIOlib import fileKey
+
+JOURNAL_SUFFIX = '.changes'
+JOURNAL_VERSION = 1
+
+
+class ChangeLog(object):
+    # CSV 를 다시 쓰지 않고 편집을 한 줄(JSON)씩 덧붙이는 저널 (fileName + '.changes').
+    # 첫 줄은 기준 CSV 의 (mtime, size), 마지막 'save' 줄까지가 저장한 편집이고 그 뒤는 저장 전 편집이다
+    def __init__(self, fileName, lines=None, saved=0):
+        self.fileName = fileName
+        self.path = fileName + JOURNAL_SUFFIX
+        self.lines = lines if lines is not None else []
+        self.saved = saved
+        self._handle = None
+
+    @classmethod
+    def load(cls, fileName):
+        # 기준 CSV 가 그대로일 때만 쓴다. 쓰다가 끊긴 마지막 줄은 버린다
+        try:
+            with open(fileName + JOURNAL_SUFFIX, encoding='utf-8') as handle:
+                base = json.loads(handle.readline() or 'null')
+                key = fileKey(fileName)
+                if not isinstance(base, dict) or base.get('version') != JOURNAL_VERSION or \
+                        base.get('key') != [key['mtime'], key['size']]:
+                    return None
+                lines, saved = [], 0
+                for line in handle:
+                    if not line.endswith('\n'):
+                        break
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        break
+                    lines.append(line[:-1])
+                    if change.get('op') == 'save':
+                        saved = len(lines)
+        except (OSError, ValueError):
+            return None
+        return cls(fileName, lines, saved)
+
+    def changes(self):
+        return [json.loads(line) for line in self.lines]
+
+    def isEmpty(self):
+        # 'save' 줄만 있으면 다시 적용할 편집이 없다
+        return all(json.loads(line).get('op') == 'save' for line in self.lines)
+
+    def unsaved(self):
+        return len(self.lines) - self.saved
+
+    def append(self, change):
+        if self._handle is None:
+            self.rewrite()
+        line = json.dumps(change, ensure_ascii=False, default=str)
+        self._handle.write(line + '\n')
+        self._handle.flush()
+        self.lines.append(line)
+
+    def save(self):
+        # 저장은 'save' 줄을 덧붙이고 디스크에 내려쓰는 것뿐이다
+        self.append({'op': 'save'})
+        os.fsync(self._handle.fileno())
+        self.saved = len(self.lines)
+
+    def rewrite(self):
+        # 기준 줄과 남은 편집으로 저널을 새로 만들어 원자적으로 바꾸고, 이어 쓸 수 있게 연다
+        self.close()
+        key = fileKey(self.fileName)
+        directory, base = os.path.split(os.path.abspath(self.path))
+        handle, tmp = tempfile.mkstemp(prefix=base + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='\n') as stream:
+                stream.write(json.dumps({'op': 'base', 'version': JOURNAL_VERSION,
+                                         'key': [key['mtime'], key['size']]}) + '\n')
+                for line in self.lines:
+                    stream.write(line + '\n')
+                stream.flush()
+                os.fsync(stream.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._handle = open(self.path, 'a', encoding='utf-8', newline='\n')
+
+    def rebase(self, fileName, count):
+        # fileName 을 앞의 count 줄까지 반영해 다시 썼다. 나머지 편집만 새 CSV 기준으로 옮긴다
+        self.close()
+        if os.path.abspath(fileName) != os.path.abspath(self.fileName):
+            # 다른 이름으로 저장했으면 원래 파일의 저널에는 저장한 편집만 남긴다
+            self.truncate(self.saved)
+        self.lines = self.lines[count:]
+        self.saved = max(0, self.saved - count)
+        self.fileName = fileName
+        self.path = fileName + JOURNAL_SUFFIX
+        if self.lines:
+            self.rewrite()
+        else:
+            self.remove()
+
+    def discardUnsaved(self):
+        # 정상적으로 닫을 때: 저장하지 않은 편집은 버린다 (비정상 종료 때만 다음에 되살린다)
+        self.close()
+        self.truncate(self.saved)
+        del self.lines[self.saved:]
+
+    def truncate(self, count):
+        lines = self.lines
+        self.lines = lines[:count]
+        try:
+            if self.lines:
+                self.rewrite()
+                self.close()
+            else:
+                self.remove()
+        finally:
+            self.lines = lines
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# BaseLine: Name, Compare, Data, Explanatory, ItemCode
+BASELINE_NAME = 'Name'
+BASELINE_COMPARE = 'Compare'
+BASELINE_DATA = 'Data'
+BASELINE_CODE = 'ItemCode'
+
+# BaseReport: 항목코드, 점검항목, 중요도, 설정이름, 설정값, 점검결과, 권고사항
+REPORT_CODE = '항목코드'
+REPORT_ITEM = '점검항목'
+REPORT_SEVERITY = '중요도'
+REPORT_NAME = '설정이름'
+REPORT_VALUE = '설정값'
+REPORT_RESULT = '점검결과'
+
+# 점검에 꼭 있어야 하는 열
+BASELINE_COLUMNS = [BASELINE_NAME, BASELINE_COMPARE, BASELINE_DATA, BASELINE_CODE]
+REPORT_COLUMNS = [REPORT_CODE, REPORT_NAME, REPORT_VALUE, REPORT_RESULT]
+
+PASS = '양호'
+FAIL = '취약'
+
+# Compare 값 -> 정규화된 연산자. 한글 임계 표현(이하/이상/미만/초과)도 받는다
+OPERATORS = {'==': '==', '=': '==', '!=': '!=', '<>': '!=',
+             '<=': '<=', '>=': '>=', '<': '<', '>': '>',
+             '이하': '<=', '이상': '>=', '미만': '<', '초과': '>',
+             '같음': '==', '다름': '!='}
+
+
+def missingColumns(df, columns):
+    return [column for column in columns if column not in df.columns]
+
+
+def toStripped(values):
+    series = pd.Series(values, dtype=object)
+    return series.astype(str).str.strip().where(series.notna().to_numpy(), '')
+
+
+def normalizeText(values):
+    return toStripped(values).str.lower().to_numpy(dtype=object)
+
+
+def normalizeRules(baseline):
+    compare = toStripped(baseline[BASELINE_COMPARE])
+    data = toStripped(baseline[BASELINE_DATA])
+    # Data 가 '5 이하' 처럼 끝에 한글 임계 표현을 달고 있으면 연산자로 바꾼다
+    suffix = data.str.extract(r'^(.*?)\s*(이하|이상|미만|초과)$')
+    hasSuffix = suffix[1].notna()
+    compare = compare.where(~hasSuffix, suffix[1])
+    data = data.where(~hasSuffix, suffix[0])
+    return pd.DataFrame({
+        'code': toStripped(baseline[BASELINE_CODE]).to_numpy(dtype=object),
+        'name': normalizeText(baseline[BASELINE_NAME]),
+        'op': compare.map(OPERATORS).to_numpy(dtype=object),
+        'data': normalizeText(data),
+    })
+
+
+def evaluate(values, ops, data):
+    # 1.0 = 통과, 0.0 = 실패, NaN = 판단 불가 (값 없음, 숫자가 아닌 값의 대소 비교 등)
+    values = normalizeText(values)
+    data = normalizeText(data)
+    ops = np.asarray(ops, dtype=object)
+    valueNum = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    dataNum = pd.to_numeric(pd.Series(data), errors='coerce').to_numpy(dtype=float)
+    numeric = ~np.isnan(valueNum) & ~np.isnan(dataNum)
+    with np.errstate(invalid='ignore'):
+        equal = np.where(numeric, valueNum == dataNum, values == data)
+        conditions = [ops == '==', ops == '!=',
+                      (ops == '<=') & numeric, (ops == '>=') & numeric,
+                      (ops == '<') & numeric, (ops == '>') & numeric]
+        choices = [equal, ~equal,
+                   valueNum <= dataNum, valueNum >= dataNum,
+                   valueNum < dataNum, valueNum > dataNum]
+    result = np.select(conditions, [c.astype(float) for c in choices], default=np.nan)
+    result[values == ''] = np.nan
+    return result
+
+
+def checkReport(report, baseline):
+    rules = normalizeRules(baseline)
+    rows = pd.DataFrame({
+        'row': np.arange(len(report.index)),
+        'code': toStripped(report[REPORT_CODE]).to_numpy(dtype=object),
+        'name': normalizeText(report[REPORT_NAME]),
+        'value': report[REPORT_VALUE].to_numpy(dtype=object),
+    })
+    # 설정이름이 규칙 Name 과 같으면 (항목코드, 이름) 으로, 아니면 규칙이 하나뿐인 항목코드로 붙인다
+    byName = rows.merge(rules, on=['code', 'name'])
+    single = rules[~rules['code'].duplicated(keep=False)].drop(columns='name')
+    byCode = rows[~rows['row'].isin(byName['row'])].merge(single, on='code')
+    pairs = pd.concat([byName, byCode], ignore_index=True)
+    pairs['ok'] = evaluate(pairs['value'], pairs['op'], pairs['data'])
+
+    failed = (pairs['ok'] == 0).groupby(pairs['row']).any()
+    known = pairs['ok'].notna().groupby(pairs['row']).all()
+    result = np.full(len(report.index), None, dtype=object)
+    result[failed.index[failed].to_numpy()] = FAIL
+    passed = known & ~failed
+    result[passed.index[passed].to_numpy()] = PASS
+    return pd.Series(result, index=report.index, name=REPORT_RESULT)
+
+
+def applyCompliance(report, baseline):
+    results = checkReport(report, baseline)
+    filled = results.notna()
+    column = report[REPORT_RESULT].astype(object)
+    column[filled] = results[filled]
+    return column, filled.to_numpy()
@@ -0,0 +1,271 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+FIRST_CHUNKSIZE = 1000
+MAX_CHUNKSIZE = 256000
+# 저장은 이 행 수마다 진행 상황을 알리고 취소 여부를 확인한다
+WRITE_CHUNKSIZE = 65536
+
+# CSV 옆에 두는 바이너리 캐시: <파일>.csv.cache/ 아래 청크별 열 .npy 와 manifest.json.
+# 문자열 열은 파일 전체에 하나인 열별 범주 표(cNNNN.values.json)와 청크별 int32 코드(.codes.npy, 빈 값은 -1)로
+# 두고, 열 때는 코드를 메모리 매핑한 범주형으로 돌려준다 (행마다 문자열을 만들지 않는다)
+CACHE_SUFFIX = '.cache'
+CACHE_VERSION = 4
+
+
+def readHeader(handle):
+    # 첫 줄은 0,1,2.. 열 번호, 둘째 줄이 실제 열 이름이다
+    labels = next(csv.reader([handle.readline()]), [])
+    line = handle.readline()
+    header = next(csv.reader([line]), [])
+    columns = pd.read_csv(io.StringIO(line), header=0).columns
+    return labels, header, columns
+
+
+def fileKey(fileName):
+    stat = os.stat(fileName)
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def isNumeric(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in 'biuf'
+
+
+class SidecarCache(object):
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.path = fileName + CACHE_SUFFIX
+        self.manifest = None
+
+    def isValid(self):
+        try:
+            with open(os.path.join(self.path, 'manifest.json'), encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return False
+        if manifest.get('version') != CACHE_VERSION or manifest.get('key') != fileKey(self.fileName):
+            # CSV 가 바뀌었으면 캐시는 버린다
+            self.discard()
+            return False
+        self.manifest = manifest
+        return True
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def categories(self):
+        # 열 번호 -> 범주 dtype. 모든 청크가 같은 dtype 을 써서 이어 붙여도 범주형으로 남는다
+        dtypes = dict()
+        for column in self.manifest['text']:
+            with open(os.path.join(self.path, 'c%04d.values.json' % column), encoding='utf-8') as handle:
+                dtypes[column] = pd.CategoricalDtype(pd.Index(json.load(handle), dtype=object))
+        return dtypes
+
+    def parts(self):
+        dtypes = self.categories()
+        start = 0
+        for number, part in enumerate(self.manifest['parts']):
+            data = dict()
+            for column in range(len(self.manifest['columns'])):
+                name = os.path.join(self.path, 'p%04d_c%04d' % (number, column))
+                if column in part['numeric']:
+                    data[column] = pd.Series(np.load(name + '.npy', mmap_mode='c'), copy=False)
+                    continue
+                codes = np.load(name + '.codes.npy', mmap_mode='c')
+                data[column] = pd.Series(pd.Categorical.from_codes(codes, dtype=dtypes[column]), copy=False)
+            frame = pd.DataFrame(data)
+            frame.columns = pd.Index(self.manifest['columns'])
+            frame.index = pd.RangeIndex(start, start + part['rows'])
+            start += part['rows']
+            yield frame
+
+
+class SidecarWriter(object):
+    def __init__(self, fileName, labels, header, columns):
+        self.fileName = fileName
+        self.path = fileName + CACHE_SUFFIX
+        self.key = fileKey(fileName)
+        directory, base = os.path.split(os.path.abspath(fileName))
+        self.tmp = tempfile.mkdtemp(prefix=base + '.', suffix='.tmp', dir=directory)
+        self.manifest = {'version': CACHE_VERSION, 'key': self.key, 'labels': labels,
+                         'header': header, 'columns': [str(col) for col in columns], 'parts': []}
+        # 열 번호 -> {문자열: 범주 번호}. 청크마다 새 값만 뒤에 붙이므로 앞 청크의 코드는 그대로다
+        self.tables = dict()
+
+    def write(self, chunk):
+        number = len(self.manifest['parts'])
+        part = {'rows': len(chunk.index), 'numeric': []}
+        for column in range(len(chunk.columns)):
+            series = chunk.iloc[:, column]
+            name = os.path.join(self.tmp, 'p%04d_c%04d' % (number, column))
+            if isNumeric(series.dtype):
+                np.save(name + '.npy', series.to_numpy())
+                part['numeric'].append(column)
+                continue
+            codes, uniques = pd.factorize(series)
+            table = self.tables.setdefault(column, dict())
+            # 마지막 -1 은 빈 값 (factorize 의 -1) 을 그대로 둔다
+            lookup = np.array([table.setdefault(str(value), len(table)) for value in uniques] + [-1], dtype=np.int32)
+            np.save(name + '.codes.npy', lookup[codes])
+        self.manifest['parts'].append(part)
+
+    def close(self):
+        for column, table in self.tables.items():
+            with open(os.path.join(self.tmp, 'c%04d.values.json' % column), 'w', encoding='utf-8') as handle:
+                json.dump(list(table), handle, ensure_ascii=False)
+        self.manifest['text'] = sorted(self.tables)
+        with open(os.path.join(self.tmp, 'manifest.json'), 'w', encoding='utf-8') as handle:
+            json.dump(self.manifest, handle, ensure_ascii=False)
+        # 이전 캐시는 지우기 전에 옆으로 옮긴다. 다른 작업자가 먼저 바꿔 놓았으면 os.replace 가 실패하고
+        # 이 캐시는 버려진다 (내용은 같다)
+        aside = self.tmp[:-len('.tmp')] + '.old.tmp'
+        try:
+            os.replace(self.path, aside)
+        except FileNotFoundError:
+            aside = None
+        try:
+            os.replace(self.tmp, self.path)
+        finally:
+            if aside is not None:
+                shutil.rmtree(aside, ignore_errors=True)
+
+    def abort(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class WriteCancelled(Exception):
+    pass
+
+
+def writeCsv(fileName, header, df, progress=None, cancelled=None, chunksize=WRITE_CHUNKSIZE):
+    # 임시 파일에 다 쓴 뒤 이름을 바꿔 원자적으로 교체한다. 취소되면 원래 파일은 그대로 둔다
+    directory, base = os.path.split(os.path.abspath(fileName))
+    handle, tmp = tempfile.mkstemp(prefix=base + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8', newline='') as stream:
+            writer = csv.writer(stream, lineterminator=os.linesep)
+            writer.writerow(range(len(df.columns)))
+            writer.writerow(header)
+            for start in range(0, len(df.index), chunksize):
+                if cancelled is not None and cancelled():
+                    raise WriteCancelled(fileName)
+                rows = df.iloc[start:start + chunksize]
+                rows.to_csv(stream, header=False, index=False, lineterminator=os.linesep)
+                if progress is not None:
+                    progress(stream.tell(), start + len(rows.index))
+        if os.path.exists(fileName):
+            shutil.copymode(fileName, tmp)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, fileName)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class CsvReader(object):
+    def __init__(self, fileName, chunksize=FIRST_CHUNKSIZE, useCache=True):
+        self.fileName = fileName
+        self.chunksize = chunksize
+        self.useCache = useCache
+        self.labels = None
+        self.header = None
+        self.columns = None
+        self.cancelled = False
+        # 진행 상황: 파일 크기와 지금까지 읽은 바이트 수 (캐시에서 읽을 때는 행 수로 어림한다)
+        self.size = os.path.getsize(fileName)
+        self.bytesRead = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def chunks(self):
+        cache = SidecarCache(self.fileName)
+        skip = 0
+        if self.useCache and cache.isValid():
+            self.labels = cache.manifest['labels']
+            self.header = cache.manifest['header']
+            self.columns = pd.Index(cache.manifest['columns'])
+            total = max(1, sum(part['rows'] for part in cache.manifest['parts']))
+            try:
+                for chunk in cache.parts():
+                    if self.cancelled:
+                        return
+                    skip += len(chunk.index)
+                    self.bytesRead = self.size * skip // total
+                    yield chunk
+                return
+            except (OSError, ValueError):
+                # 다른 작업자가 캐시를 바꾸는 중이었다. 이미 넘긴 행 뒤부터 CSV 에서 읽는다
+                pass
+
+        # 한 번의 순차 읽기로 헤더와 본문을 읽는다. 첫 청크는 작게 해서 바로 화면에 보이게 하고
+        # 이후 청크는 두 배씩 키워 이어 붙이는 비용을 줄인다.
+        # dtype 을 청크마다 따로 추론하면 같은 열이 청크에 따라 0 과 0.0 이 되므로 모든 열을 문자열로 읽는다
+        writer = None
+        completed = False
+        try:
+            with open(self.fileName, encoding='utf-8', newline='') as handle:
+                self.labels, self.header, self.columns = readHeader(handle)
+                if self.useCache and not skip:
+                    writer = self.openWriter()
+                reader = pd.read_csv(handle, header=None, names=self.columns, dtype=str,
+                                     chunksize=self.chunksize, skiprows=skip)
+                with reader:
+                    size = self.chunksize
+                    while not self.cancelled:
+                        try:
+                            chunk = reader.get_chunk(size)
+                        except StopIteration:
+                            completed = True
+                            return
+                        if skip:
+                            chunk.index = chunk.index + skip
+                        if writer is not None:
+                            writer = self.writeCache(writer, chunk)
+                        self.bytesRead = handle.buffer.tell()
+                        yield chunk
+                        size = min(size * 2, MAX_CHUNKSIZE)
+        finally:
+            if writer is not None:
+                if completed and writer.key == fileKey(self.fileName):
+                    self.closeWriter(writer)
+                else:
+                    writer.abort()
+
+    def openWriter(self):
+        try:
+            return SidecarWriter(self.fileName, self.labels, self.header, self.columns)
+        except OSError:
+            return None
+
+    def writeCache(self, writer, chunk):
+        # 캐시는 선택 사항이므로 쓰기에 실패하면 조용히 포기한다
+        try:
+            writer.write(chunk)
+            return writer
+        except (OSError, ValueError):
+            writer.abort()
+            return None
+
+    def closeWriter(self, writer):
+        try:
+            writer.close()
+        except OSError:
+            writer.abort()
+
+    def read(self):
+        frames = list(self.chunks())
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(frames)
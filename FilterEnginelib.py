@@ -0,0 +1,181 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+CHUNKSIZE = 65536
+
+
+def toText(values):
+    # str() 과 같은 표현을 numpy 에서 한 번에 만든다
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # 범주형은 범주 문자열을 그대로 가리키므로 같은 값은 한 문자열 객체를 같이 쓴다
+        categorical = pd.Categorical(values)
+        texts = [value if isinstance(value, str) else str(value) for value in categorical.categories]
+        return np.array(texts + [str(np.nan)], dtype=object)[categorical.codes]
+    # astype(str) 은 가장 긴 값 길이의 고정폭 유니코드 배열을 거치므로 객체 문자열을 바로 만든다
+    values = np.asarray(values, dtype=object)
+    return np.fromiter(map(str, values.ravel()), dtype=object, count=values.size).reshape(values.shape)
+
+
+def compileFilter(expresion):
+    # QRegExp(expresion, Qt.CaseInsensitive, QRegExp.RegExp) 와 같은 의미
+    try:
+        return re.compile(expresion, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def columnMask(regex, values):
+    if regex is None:
+        # 잘못된 정규식은 QRegExp 처럼 어떤 행과도 일치하지 않는다
+        return np.zeros(len(values), dtype=bool)
+    series = pd.Series(values, dtype=object)
+    return np.array(series.str.contains(regex, na=False), dtype=bool)
+
+
+def frameMask(df, expresions):
+    mask = np.ones(len(df.index), dtype=bool)
+    for column, expresion in expresions.items():
+        if 0 <= column < len(df.columns):
+            values = toText(df.iloc[:, column])
+        else:
+            values = np.full(len(df.index), '', dtype=object)
+        mask &= columnMask(compileFilter(expresion), values)
+    return mask
+
+
+def chunkedColumnMask(regex, values, cancelled, chunksize=CHUNKSIZE):
+    # 작업 스레드에서 사용: 청크마다 취소 여부를 확인하고 취소되면 None
+    mask = np.empty(len(values), dtype=bool)
+    for start in range(0, len(values), chunksize):
+        if cancelled():
+            return None
+        mask[start:start + chunksize] = columnMask(regex, values[start:start + chunksize])
+    return mask
+
+
+class ColumnFilterEngine(object):
+    def __init__(self):
+        self._expresions = dict()
+        self._regex = dict()
+        self._masks = dict()
+        self._stale = dict()
+        self._mask = None
+
+    @property
+    def expresions(self):
+        return self._expresions
+
+    def setFilter(self, expresion, column):
+        if expresion:
+            if self._expresions.get(column) == expresion:
+                return False
+            self._expresions[column] = expresion
+            self._regex[column] = compileFilter(expresion)
+        elif column in self._expresions:
+            del self._expresions[column]
+            del self._regex[column]
+        else:
+            return False
+        self._masks.pop(column, None)
+        self._stale.pop(column, None)
+        self._mask = None
+        return True
+
+    def hasMask(self, expresion, column):
+        return self._expresions.get(column) == expresion and column in self._masks \
+            and column not in self._stale
+
+    def setColumnMask(self, expresion, column, mask):
+        self._expresions[column] = expresion
+        self._regex[column] = compileFilter(expresion)
+        self._masks[column] = mask
+        self._stale.pop(column, None)
+        self._mask = None
+
+    def invalidate(self, columns=None, first=None, last=None):
+        if columns is None:
+            columns = list(self._masks)
+        for column in columns:
+            if column not in self._masks:
+                continue
+            if first is None:
+                del self._masks[column]
+                self._stale.pop(column, None)
+            else:
+                self._stale.setdefault(column, []).append((first, last))
+            self._mask = None
+
+    def insertRows(self, first, last):
+        # 새 행의 마스크만 나중에 계산한다
+        count = last - first + 1
+        for column, columnMaskCache in self._masks.items():
+            self._masks[column] = np.insert(columnMaskCache, first, np.zeros(count, dtype=bool))
+            self._stale[column] = [(a + count if a >= first else a, b + count if b >= first else b)
+                                   for a, b in self._stale.get(column, ())]
+            self._stale[column].append((first, last))
+        self._mask = None
+
+    def removeRows(self, first, last):
+        count = last - first + 1
+        for column, columnMaskCache in self._masks.items():
+            self._masks[column] = np.delete(columnMaskCache, np.s_[first:last + 1])
+            stale = []
+            for a, b in self._stale.get(column, ()):
+                a = a if a < first else max(a - count, first)
+                b = b if b < first else b - count
+                if a <= b:
+                    stale.append((a, b))
+            self._stale[column] = stale
+        self._mask = None
+
+    def keepRows(self, keep):
+        # 흩어진 행을 한 번에 지운다. 다시 계산할 범위는 남은 행 번호로 옮긴다.
+        # 가상 모드에서 노출된 행만큼의 마스크는 버린다
+        before = np.concatenate([[0], np.cumsum(keep)])
+        for column in list(self._masks):
+            if len(self._masks[column]) != len(keep):
+                del self._masks[column]
+                self._stale.pop(column, None)
+                continue
+            self._masks[column] = self._masks[column][keep]
+            stale = []
+            for a, b in self._stale.get(column, ()):
+                a, b = int(before[a]), int(before[b + 1]) - 1
+                if a <= b:
+                    stale.append((a, b))
+            self._stale[column] = stale
+        self._mask = None
+
+    def permute(self, order):
+        # 정렬: 새 행 i 는 이전 행 order[i]. 다시 계산할 범위가 남은 열은 버린다
+        for column in list(self._masks):
+            if len(self._masks[column]) == len(order) and not self._stale.get(column):
+                self._masks[column] = self._masks[column][order]
+            else:
+                del self._masks[column]
+                self._stale.pop(column, None)
+        self._mask = None
+
+    def mask(self, columnText, rowCount):
+        if not self._expresions:
+            return None
+        if self._mask is not None and len(self._mask) == rowCount:
+            return self._mask
+        mask = np.ones(rowCount, dtype=bool)
+        for column, regex in self._regex.items():
+            columnMaskCache = self._masks.get(column)
+            if columnMaskCache is None or len(columnMaskCache) != rowCount:
+                columnMaskCache = columnMask(regex, columnText(column))
+                self._stale.pop(column, None)
+            elif self._stale.get(column):
+                # 편집된 셀 범위만 모아서 한 번에 다시 계산
+                stale = self._stale.pop(column)
+                rows = np.concatenate([np.arange(first, last + 1) for first, last in stale])
+                values = np.concatenate([columnText(column, first, last) for first, last in stale])
+                columnMaskCache[rows] = columnMask(regex, values)
+            self._masks[column] = columnMaskCache
+            mask &= columnMaskCache
+        self._mask = mask
+        return mask
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from Compliancelib import BASELINE_CODE, REPORT_CODE
+from FilterEnginelib import toText
+
+# 행을 맞출 키 열. 없으면 행 위치로 맞춘다
+KEYCOLUMNS = [BASELINE_CODE, REPORT_CODE]
+
+
+class FrameDiff(object):
+    # old 의 행 번호 기준: removed 는 없어진 행, changed/changedNew 는 값이 바뀐 (old 행, new 행),
+    # columns 는 바뀐 값이 있는 열, added 는 new 에만 있는 행, newRows 는 old 행별 new 행 번호 (없으면 -1)
+    def __init__(self, removed, changed, changedNew, columns, added, newRows):
+        self.removed = removed
+        self.changed = changed
+        self.changedNew = changedNew
+        self.columns = columns
+        self.added = added
+        self.newRows = newRows
+
+
+def keyColumn(old, new):
+    for column in KEYCOLUMNS:
+        if column in old.columns and column in new.columns:
+            return column
+    return None
+
+
+def occurrenceKeys(keys):
+    # 같은 키가 여러 행이면 (한 항목코드에 설정이 여러 개) 키 안에서 몇 번째인지를 붙여 구분한다
+    keys = pd.Series(keys, dtype=object)
+    occurrence = keys.groupby(keys.to_numpy(), sort=False).cumcount()
+    return (keys + '\x00' + occurrence.astype(str)).to_numpy(dtype=object)
+
+
+def matchRows(oldKeys, newKeys, oldRows, newRows):
+    # 아직 짝이 없는 행끼리 키로 맞춘다
+    oldFree = np.flatnonzero(newRows < 0)
+    newFree = np.flatnonzero(oldRows < 0)
+    if not len(oldFree) or not len(newFree):
+        return
+    found = pd.Index(occurrenceKeys(oldKeys[oldFree])).get_indexer(occurrenceKeys(newKeys[newFree]))
+    matched = found >= 0
+    oldRows[newFree[matched]] = oldFree[found[matched]]
+    newRows[oldFree[found[matched]]] = newFree[matched]
+
+
+def rowTexts(texts):
+    joined = pd.Series(texts[0], dtype=object)
+    for text in texts[1:]:
+        joined = joined + '\x1f' + text
+    return joined.to_numpy(dtype=object)
+
+
+def diffFrames(old, new):
+    # 열이 다르면 None (전체를 다시 읽어야 한다)
+    if list(old.columns) != list(new.columns):
+        return None
+    oldTexts = [toText(old.iloc[:, number]) for number in range(len(old.columns))]
+    newTexts = [toText(new.iloc[:, number]) for number in range(len(new.columns))]
+    oldRows = np.full(len(new.index), -1, dtype=np.intp)
+    newRows = np.full(len(old.index), -1, dtype=np.intp)
+    # 먼저 내용이 똑같은 행끼리, 남은 행은 키 열(없으면 위치)로 짝을 지어 바뀐 행으로 본다
+    if len(old.columns):
+        matchRows(rowTexts(oldTexts), rowTexts(newTexts), oldRows, newRows)
+    column = keyColumn(old, new)
+    if column is None:
+        matchRows(np.full(len(old.index), '', dtype=object), np.full(len(new.index), '', dtype=object),
+                  oldRows, newRows)
+    else:
+        number = old.columns.get_loc(column)
+        matchRows(oldTexts[number], newTexts[number], oldRows, newRows)
+    common = np.flatnonzero(oldRows >= 0)
+    kept = oldRows[common]
+
+    differs = []
+    changedRows = np.zeros(len(common), dtype=bool)
+    for number in range(len(old.columns)):
+        mask = oldTexts[number][kept] != newTexts[number][common]
+        differs.append(mask)
+        changedRows |= mask
+    columns = [number for number, mask in enumerate(differs) if mask[changedRows].any()]
+    return FrameDiff(np.flatnonzero(newRows < 0), kept[changedRows], common[changedRows], columns,
+                     np.flatnonzero(oldRows < 0), newRows)
@@ -1,33 +1,272 @@
+from collections import OrderedDict
+
 from PyQt5 import QtCore
 
+import numpy as np
 import pandas as pd
 
+from FilterEnginelib import toText
+from SortKeylib import columnRanks
+
+
+# 가상 모드: 행을 FETCHSIZE 씩 노출하고 문자열은 BLOCKSIZE 행 단위로 최대 MAXBLOCKS 개만 보관
+FETCHSIZE = 10000
+BLOCKSIZE = 1024
+MAXBLOCKS = 64
+# insertRows 용 여유 행은 최소 이만큼, 지운 행이 이보다 많고 남은 행보다 많으면 저장소를 압축한다
+SPARESIZE = 1024
+COMPACTSIZE = 4096
+# 다중 열 정렬에 쓰는 최근 정렬 열 수
+MAXSORTKEYS = 3
+
 
 class PandasModel(QtCore.QAbstractTableModel):
-    def __init__(self, df=pd.DataFrame(), parent=None):
+    # sort 로 행 순서가 바뀔 때 layoutChanged 전에 새 순서(이전 행 번호 배열)를 알린다
+    rowsPermuted = QtCore.pyqtSignal(object)
+    # removeRowSet 으로 흩어진 행을 한 번에 지울 때 layoutChanged 전에 남는 행(논리 행별 bool)을 알린다
+    rowsKept = QtCore.pyqtSignal(object)
+    # 편집 저널에 쓰지 못해 저널을 버렸을 때 (오류 메시지)
+    journalFailed = QtCore.pyqtSignal(str)
+
+    def __init__(self, df=pd.DataFrame(), parent=None, copy=True, virtual=False):
         QtCore.QAbstractTableModel.__init__(self, parent=parent)
-        self._data = df.copy()
+        # 물리 저장소(_data)에는 행을 뒤에만 붙이고 화면의 행 순서는 _rows(논리 행 -> 물리 행)로 관리한다.
+        # 행 추가/삭제는 _rows 만 고치고, 지운 행은 compact 때 정리한다
+        self._data = (df.copy() if copy else df).reset_index(drop=True)
+        self._size = len(self._data.index)
+        self._rows = np.arange(self._size)
+        self._sequential = True
+        self._spare = None
         self.bolds = dict()
+        # 열 번호 -> 물리 행 순서의 화면 문자열, 필요할 때 열 단위로 만든다
+        self._text = dict()
+        # 열 번호 -> 논리 행 순서의 화면 문자열, 행 순서가 바뀌면 버린다
+        self._ordered = dict()
+        self._columns = None
+        self.virtual = virtual
+        self._blocks = OrderedDict()
+        self._fetched = min(FETCHSIZE, self._size)
+        # 정렬은 _rows 만 바꾼다. 열 번호 -> 물리 행별 정렬 순위, 정렬 키 -> 정렬된 _rows
+        self.sortKeys = []
+        self._ranks = dict()
+        self._sorted = dict()
+        # 불러온 뒤 내용이 바뀔 때마다 증가 (fetchMore, 스트리밍 추가는 제외)
+        self.revision = 0
+        # 내용(값, 행)이 바뀐 횟수. revision 과 달리 정렬은 세지 않는다
+        self.edits = 0
+        # 있으면 편집(setData, 행 추가/삭제, 열 교체)을 한 건씩 기록한다 (ChangeLoglib.ChangeLog).
+        # 정렬은 편집이 아니므로 바로 남기지 않고, 행 순서가 바뀐 뒤 처음 편집하거나 저장할 때 남긴다
+        self.changeLog = None
+        self._orderLogged = True
 
     def toDataFrame(self):
-        return self._data.copy()
+        return self.frame().copy()
+
+    def frame(self):
+        # 화면 순서 그대로의 DataFrame (복사하지 않으므로 고치지 말 것)
+        self.compact()
+        return self._data
+
+    def totalRowCount(self):
+        return len(self._rows)
+
+    def compact(self):
+        if self._sequential and len(self._rows) == len(self._data.index):
+            return
+        if self._sequential:
+            self._data = self._data.iloc[:len(self._rows)]
+            for column, text in self._text.items():
+                self._text[column] = text[:len(self._rows)]
+            for column, ranks in self._ranks.items():
+                self._ranks[column] = ranks[:len(self._rows)]
+        else:
+            self._data = self._data.take(self._rows).reset_index(drop=True)
+            for column, text in self._text.items():
+                self._text[column] = text[self._rows]
+            for column, ranks in self._ranks.items():
+                self._ranks[column] = ranks[self._rows]
+        self._size = len(self._rows)
+        self._rows = np.arange(self._size)
+        self._sequential = True
+        self._spare = None
+        self._ordered.clear()
+        self._sorted.clear()
+
+    def allocate(self, rows, value):
+        # 여유 행을 value 로 미리 채워 두고 앞에서부터 내준다. 모자라면 현재 크기의 절반 이상씩 늘린다
+        if self._spare != value or len(self._data.index) - self._size < rows:
+            count = max(rows, self._size // 2, SPARESIZE)
+            block = pd.DataFrame({column: self.spareColumn(column, count, value)
+                                  for column in range(self.columnCount())})
+            block.columns = self._data.columns
+            self._data = pd.concat([self._data.iloc[:self._size], block], ignore_index=True)
+            for column, text in self._text.items():
+                self._text[column] = np.concatenate([text[:self._size], toText(block.iloc[:, column])])
+            self._ranks.clear()
+            self._spare = value
+        physical = np.arange(self._size, self._size + rows)
+        self._size += rows
+        return physical
+
+    def spareColumn(self, column, count, value):
+        # 범주형 열은 같은 범주의 범주형으로 만들어야 이어 붙인 뒤에도 범주형으로 남는다
+        dtype = self._data.dtypes.iloc[column]
+        if not isinstance(dtype, pd.CategoricalDtype):
+            return np.full(count, value, dtype=object)
+        if value not in dtype.categories:
+            self._data.isetitem(column, self._data.iloc[:, column].cat.add_categories([value]))
+            dtype = self._data.dtypes.iloc[column]
+        return pd.Categorical(np.full(count, value, dtype=object), dtype=dtype)
+
+    def alignCategories(self, df):
+        # 범주가 다른 범주형 열끼리 이어 붙이면 object 열이 되므로 범주를 먼저 합친다
+        for column in range(min(len(df.columns), self.columnCount())):
+            old, new = self._data.dtypes.iloc[column], df.dtypes.iloc[column]
+            if not isinstance(old, pd.CategoricalDtype) or not isinstance(new, pd.CategoricalDtype) \
+                    or old.categories.equals(new.categories):
+                continue
+            categories = old.categories.append(new.categories.difference(old.categories))
+            dtype = new if categories.equals(new.categories) else pd.CategoricalDtype(categories)
+            self._data.isetitem(column, self._data.iloc[:, column].astype(dtype))
+            df = df.copy(deep=False)
+            df.isetitem(column, df.iloc[:, column].astype(dtype))
+        return df
+
+    def reordered(self):
+        self._ordered.clear()
+        self._blocks.clear()
+
+    def appendFrame(self, df):
+        if len(df.index) == 0:
+            return
+        first = len(self._rows)
+        if not self.virtual:
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(df.index) - 1)
+        self._sequential = self._sequential and first == self._size
+        df = self.alignCategories(df)
+        self._data = pd.concat([self._data.iloc[:self._size], df], ignore_index=True)
+        for column, text in self._text.items():
+            self._text[column] = np.concatenate([text[:self._size], toText(df.iloc[:, column])])
+        self._rows = np.concatenate([self._rows, np.arange(self._size, len(self._data.index))])
+        self._size = len(self._data.index)
+        self._spare = None
+        self._ordered.clear()
+        self._ranks.clear()
+        self._sorted.clear()
+        if self.virtual:
+            # 새 행은 fetchMore 로 노출한다
+            self._blocks.pop(first // BLOCKSIZE, None)
+            if self._fetched < FETCHSIZE:
+                self.fetchMore(QtCore.QModelIndex())
+            return
+        self.endInsertRows()
+
+    def insertRows(self, position, rows=1, parent=QtCore.QModelIndex(), value='NoData'):
+        if position < 0 or position > self.rowCount() or rows < 1:
+            return False
+        self.beginInsertRows(QtCore.QModelIndex(), position, position + rows - 1)
+        self._sequential = self._sequential and position == len(self._rows) == self._size
+        self._rows = np.insert(self._rows, position, self.allocate(rows, value))
+        self.reordered()
+        self._sorted.clear()
+        self._fetched += rows
+        self.revision += 1
+        self.edits += 1
+        self.endInsertRows()
+        self.record('insert', position=position, rows=rows, value=value)
+        return True
+
+    def removeRows(self, position, rows=1, parent=QtCore.QModelIndex()):
+        if position < 0 or rows < 1 or position + rows > self.rowCount():
+            return False
+        self.beginRemoveRows(QtCore.QModelIndex(), position, position + rows - 1)
+        self._sequential = self._sequential and position + rows == len(self._rows)
+        self._rows = np.delete(self._rows, np.s_[position:position + rows])
+        self.reordered()
+        self._sorted.clear()
+        self._fetched -= rows
+        self.revision += 1
+        self.edits += 1
+        self.endRemoveRows()
+        if self._size - len(self._rows) > max(COMPACTSIZE, len(self._rows)):
+            self.compact()
+        self.record('remove', position=position, rows=rows)
+        return True
+
+    def removeRowSet(self, rows):
+        # 흩어진 논리 행들을 구간마다 나누지 않고 한 번에 지운다: _rows 를 한 번 거르고 layoutChanged 로 알린다
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        if len(rows) == 0 or rows[0] < 0 or rows[-1] >= self.rowCount():
+            return False
+        self.layoutAboutToBeChanged.emit()
+        keep = np.ones(len(self._rows), dtype=bool)
+        keep[rows] = False
+        kept = len(self._rows) - len(rows)
+        self._sequential = self._sequential and bool(keep[:kept].all())
+        self._rows = self._rows[keep]
+        self.reordered()
+        self._sorted.clear()
+        self._fetched -= len(rows)
+        self.revision += 1
+        self.edits += 1
+        self.rowsKept.emit(keep)
+        persistent = self.persistentIndexList()
+        if persistent:
+            # 남은 행은 앞에서 지운 행 수만큼 당기고, 지운 행의 영구 인덱스는 무효로 한다
+            moved = np.cumsum(keep) - 1
+            self.changePersistentIndexList(persistent, [self.index(int(moved[index.row()]), index.column())
+                                                        if keep[index.row()] else QtCore.QModelIndex()
+                                                        for index in persistent])
+        self.layoutChanged.emit()
+        if self._size - len(self._rows) > max(COMPACTSIZE, len(self._rows)):
+            self.compact()
+        self.record('delete', rows=rows.tolist())
+        return True
+
+    def setColumn(self, column, values):
+        self.compact()
+        self._data.isetitem(column, np.asarray(values, dtype=object))
+        self._text.pop(column, None)
+        self._ordered.pop(column, None)
+        self._ranks.pop(column, None)
+        self._sorted.clear()
+        self._blocks.clear()
+        self.revision += 1
+        self.edits += 1
+        if self.rowCount() > 0:
+            self.dataChanged.emit(self.index(0, column), self.index(self.rowCount() - 1, column))
+        if self.changeLog is not None:
+            self.record('column', column=column, values=pd.Series(values, dtype=object).where(
+                pd.notna(values), None).tolist())
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return self.virtual and self._fetched < len(self._rows)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        count = min(FETCHSIZE, len(self._rows) - self._fetched)
+        if not self.virtual or count <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
 
     def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
         if orientation == QtCore.Qt.Horizontal:
             if role == QtCore.Qt.DisplayRole:
+                if self._columns is None:
+                    self._columns = self._data.columns.tolist()
                 try:
-                    return self._data.columns.tolist()[section]
+                    return self._columns[section]
                 except (IndexError,):
                     return QtCore.QVariant()
             elif role == QtCore.Qt.FontRole:
                 return self.bolds.get(section, QtCore.QVariant())
         elif orientation == QtCore.Qt.Vertical:
             if role == QtCore.Qt.DisplayRole:
-                try:
-                    # return self.df.index.tolist()
-                    return self._data.index.tolist()[section]
-                except (IndexError,):
-                    return QtCore.QVariant()
+                # 행을 넣거나 지울 때마다 0 부터 다시 매기던 번호와 같다
+                if 0 <= section < self.rowCount():
+                    return section
+                return QtCore.QVariant()
         return QtCore.QVariant()
 
     def setFont(self, section, font):
@@ -44,67 +283,249 @@ class PandasModel(QtCore.QAbstractTableModel):
     #    return QtCore.QVariant(str(self._data.iloc[index.row(), index.column()]))
         if index.isValid():
             if role == QtCore.Qt.DisplayRole:
-                return str(self._data.values[index.row()][index.column()])
+                return self.cellText(index.row(), index.column())
             elif role == QtCore.Qt.TextAlignmentRole:
                 return QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter | QtCore.Qt.AlignCenter
             elif role == QtCore.Qt.EditRole:
-                return str(self._data.values[index.row()][index.column()])
+                return self.cellText(index.row(), index.column())
 
         return None
 
-    def setData(self, index, value, role):
-        row = self._data.index[index.row()]
-        col = self._data.columns[index.column()]
-        if not index.isValid():
-            return False
-        if role != QtCore.Qt.EditRole:
-            return False
-        row = index.row()
-        if row < 0 or row >= len(self._data.values):
-            return False
-        column = index.column()
-        if column < 0 or column >= self._data.columns.size:
-            return False
-        if hasattr(value, 'toPyObject'):
-            # PyQt4 gets a QVariant
-            value = value.toPyObject()
+    def cellText(self, row, column):
+        if not self.virtual:
+            return self.physicalText(column)[self._rows[row]]
+        block = row // BLOCKSIZE
+        text = self._blocks.get(block)
+        if text is None:
+            start = block * BLOCKSIZE
+            text = self._blocks[block] = toText(self._data.iloc[self._rows[start:start + BLOCKSIZE]])
+            if len(self._blocks) > MAXBLOCKS:
+                self._blocks.popitem(last=False)
         else:
-            # PySide gets an unicode
-            dtype = self._data[col].dtype
-            if dtype != object:
-                value = None if value == '' else dtype.type(value)
-        self._data.set_value(row, col, value)
-        return True
+            self._blocks.move_to_end(block)
+        return text[row - block * BLOCKSIZE, column]
+
+    def physicalText(self, column):
+        text = self._text.get(column)
+        if text is None:
+            text = self._text[column] = toText(self._data.iloc[:, column])
+        return text
+
+    def textRange(self, column, first, last):
+        if self.virtual:
+            return toText(self._data.iloc[self._rows[first:last + 1], column])
+        return self.physicalText(column)[self._rows[first:last + 1]]
+
+    def columnText(self, column):
+        if self.virtual:
+            # 가상 모드에서는 열 전체를 보관하지 않는다
+            return toText(self._data.iloc[self._rows[:self._fetched], column])
+        text = self.physicalText(column)
+        if self._sequential:
+            return text[:len(self._rows)]
+        ordered = self._ordered.get(column)
+        if ordered is None:
+            ordered = self._ordered[column] = text[self._rows]
+        return ordered
 
     def rowCount(self, parent=QtCore.QModelIndex()):
-        return len(self._data.index)
+        if self.virtual:
+            return self._fetched
+        return len(self._rows)
 
     def columnCount(self, parent=QtCore.QModelIndex()):
         return len(self._data.columns)
 
+    def ranks(self, column):
+        ranks = self._ranks.get(column)
+        if ranks is None or len(ranks) != len(self._data.index):
+            ranks = self._ranks[column] = columnRanks(self._data.iloc[:, column])
+        return ranks
+
     def sort(self, column, order):
-        colname = self._data.columns.tolist()[column]
+        # 마지막으로 정렬한 열이 1순위, 그 전에 정렬한 열들이 다음 순위가 된다
+        if column < 0 or column >= self.columnCount():
+            return
+        keys = [(column, order == QtCore.Qt.AscendingOrder)]
+        keys += [key for key in self.sortKeys if key[0] != column]
+        self.sortBy(keys[:MAXSORTKEYS])
+
+    def sortKey(self, column, ascending):
+        # 물리 행별 정렬 키 (작은 값이 앞). 내림차순에서도 빈 값(가장 큰 순위)은 맨 뒤에 둔다
+        ranks = self.ranks(column)
+        top = int(ranks.max()) if len(ranks) else 0
+        if not ascending:
+            missing = self._data.iloc[:, column].isna().to_numpy()
+            ranks = np.where(missing, top + 1, top - ranks)
+            top += 1
+        # 범위가 좁으면 16비트로 줄여 기수 정렬을 쓰게 한다
+        return ranks.astype(np.uint16) if top <= np.iinfo(np.uint16).max else ranks
+
+    def stableSort(self, rows, column, ascending):
+        return rows[np.argsort(self.sortKey(column, ascending)[rows], kind='stable')]
+
+    def sortBy(self, keys):
         self.layoutAboutToBeChanged.emit()
-        self._data.sort_values(colname, ascending=order ==
-                             QtCore.Qt.AscendingOrder, inplace=True)
-        self._data.reset_index(inplace=True, drop=True)
+        keys = [(column, ascending) for column, ascending in keys]
+        rows = self._sorted.get(tuple(keys))
+        if rows is None:
+            current = self._sorted.get(tuple(self.sortKeys))
+            if current is self._rows and keys[1:] == [key for key in self.sortKeys if key[0] != keys[0][0]]:
+                # 지금 순서가 나머지 키로 정렬된 그대로이면 1순위 키로 한 번만 안정 정렬한다 (A -> B -> A 등)
+                rows = self.stableSort(current, *keys[0])
+            else:
+                # 물리 행 번호(불러온 순서)에서 시작해 낮은 순위 키부터 차례로 안정 정렬한다
+                rows = np.sort(self._rows)
+                for column, ascending in reversed(keys):
+                    rows = self.stableSort(rows, column, ascending)
+            self._sorted[tuple(keys)] = rows
+        self.sortKeys = keys
+        self.setOrder(rows, layout=False)
         self.layoutChanged.emit()
 
+    def setOrder(self, rows, layout=True):
+        # 행 순서를 rows(논리 행 -> 물리 행)로 바꾸고 영구 인덱스를 옮긴다
+        if layout:
+            self.layoutAboutToBeChanged.emit()
+        position = np.empty(len(self._data.index), dtype=np.intp)
+        position[self._rows] = np.arange(len(self._rows))
+        order = position[rows]
+        self._rows = rows
+        self._sequential = False
+        self._orderLogged = False
+        self.reordered()
+        self.revision += 1
+        self.rowsPermuted.emit(order)
+        persistent = self.persistentIndexList()
+        if persistent:
+            moved = np.empty(len(order), dtype=np.intp)
+            moved[order] = np.arange(len(order))
+            self.changePersistentIndexList(persistent, [self.index(int(moved[index.row()]), index.column())
+                                                        for index in persistent])
+        if layout:
+            self.layoutChanged.emit()
+
     def setData(self, index, value, role):
         if not index.isValid():
             return False
         if role != QtCore.Qt.EditRole:
             return False
         row = index.row()
-        if row < 0 or row >= len(self._data.values):
+        if row < 0 or row >= self.rowCount():
             return False
         column = index.column()
-        if column < 0 or column >= self._data.columns.size:
+        if column < 0 or column >= self.columnCount():
             return False
-        self._data.values[row][column] = value
+        physical = self._rows[row]
+        try:
+            self._data.iat[physical, column] = value
+        except (TypeError, ValueError):
+            series = self._data.iloc[:, column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # 범주형 열에 없는 값은 범주에 더한다
+                self._data.isetitem(column, series.cat.add_categories([value]))
+            else:
+                # 숫자 열에 문자열을 넣으면 object 열로 바꾼다
+                self._data.isetitem(column, series.astype(object))
+            self._data.iat[physical, column] = value
+        text = str(self._data.iat[physical, column])
+        if column in self._text:
+            self._text[column][physical] = text
+        if column in self._ordered:
+            self._ordered[column][row] = text
+        self._ranks.pop(column, None)
+        self._sorted.clear()
+        block = self._blocks.get(row // BLOCKSIZE)
+        if block is not None:
+            block[row % BLOCKSIZE, column] = text
+        self.revision += 1
+        self.edits += 1
         self.dataChanged.emit(index, index)
+        self.record('set', row=row, column=column, value=value)
         return True
 
+    def setRows(self, rows, df, columns):
+        # 논리 행 rows 를 df(같은 열, rows 와 같은 순서)의 값으로 바꾼다. 열마다 한 번에 쓰고 연속 구간마다 알린다
+        if len(rows) == 0:
+            return
+        physical = self._rows[rows]
+        for column in columns:
+            values = df.iloc[:, column].to_numpy(dtype=object)
+            series = self._data.iloc[:, column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                missing = pd.Index(pd.unique(values[pd.notna(values)])).difference(series.cat.categories)
+                if len(missing):
+                    self._data.isetitem(column, series.cat.add_categories(missing))
+            try:
+                self._data.iloc[physical, column] = values
+            except (TypeError, ValueError):
+                self._data.isetitem(column, series.astype(object))
+                self._data.iloc[physical, column] = values
+            text = toText(self._data.iloc[physical, column])
+            if column in self._text:
+                self._text[column][physical] = text
+            if column in self._ordered:
+                self._ordered[column][rows] = text
+            self._ranks.pop(column, None)
+        self._sorted.clear()
+        self._blocks.clear()
+        self.revision += 1
+        self.edits += 1
+        # 가상 모드에서 아직 노출되지 않은 행은 알리지 않는다
+        rows = np.sort(rows)
+        rows = rows[rows < self.rowCount()]
+        for block in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1) if len(rows) else []:
+            self.dataChanged.emit(self.index(int(block[0]), 0), self.index(int(block[-1]), self.columnCount() - 1))
+
+    def record(self, op, **change):
+        change['op'] = op
+        self.recordChanges([change])
+
+    def recordOrder(self):
+        # 저장할 때: 정렬로 바뀐 행 순서만 남아 있으면 남긴다
+        self.recordChanges([])
+
+    def recordChanges(self, changes):
+        # 모델을 바꾸고 알린 뒤에 부른다. 저널에 쓰지 못하면 저널을 버리고 (이후 저장은 전체 저장) 알린다
+        if self.changeLog is None:
+            return
+        if not self._orderLogged and self.sortKeys:
+            # 저널을 다시 적용할 때 편집한 행 번호가 같은 행을 가리키도록 그 앞의 정렬을 먼저 남긴다
+            changes = [{'op': 'sort', 'keys': [[column, ascending] for column, ascending in self.sortKeys]}] + changes
+        try:
+            for change in changes:
+                self.changeLog.append(change)
+        except OSError as e:
+            self.changeLog = None
+            self.journalFailed.emit(str(e))
+            return
+        self._orderLogged = True
+
+    def applyChange(self, change):
+        # 기록한 편집을 다시 적용한다. 가상 모드에서는 편집한 행까지 먼저 노출한다
+        op = change['op']
+        if op == 'set':
+            self.fetchTo(change['row'])
+            self.setData(self.index(change['row'], change['column']), change['value'], QtCore.Qt.EditRole)
+        elif op == 'insert':
+            self.fetchTo(change['position'] - 1)
+            self.insertRows(change['position'], change['rows'], value=change['value'])
+        elif op == 'remove':
+            self.fetchTo(change['position'] + change['rows'] - 1)
+            self.removeRows(change['position'], change['rows'])
+        elif op == 'delete':
+            self.fetchTo(max(change['rows']))
+            self.removeRowSet(change['rows'])
+        elif op == 'column':
+            self.setColumn(change['column'], change['values'])
+        elif op == 'sort':
+            self.sortBy([(column, ascending) for column, ascending in change['keys']])
+            self._orderLogged = True
+
+    def fetchTo(self, row):
+        while row >= self.rowCount() and self.canFetchMore():
+            self.fetchMore(QtCore.QModelIndex())
+
     def flags(self, index):
         flags = super(self.__class__, self).flags(index)
         flags |= QtCore.Qt.ItemIsEditable
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import defaultdict, deque
+
+# 추적 파일로 내보낼 최근 호출 수 (오래된 것부터 버린다)
+MAXEVENTS = 200000
+
+
+class Profiler(object):
+    # 켜져 있을 때만 등록된 메서드를 시간 재는 래퍼로 바꿔 끼운다. 꺼지면 원래 메서드로 되돌리므로 비용이 없다
+    def __init__(self):
+        self.enabled = False
+        self._targets = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = defaultdict(int)
+            self.seconds = defaultdict(float)
+            self.events = deque(maxlen=MAXEVENTS)
+            self.frames = 0
+            self.lastFrame = dict()
+            self._frameCounts = dict()
+            self._origin = time.perf_counter()
+
+    def register(self, owner, **names):
+        # register(PandasModel, data='data') : 속성 이름 = 보고서에 쓸 이름
+        for attribute, name in names.items():
+            function = owner.__dict__[attribute]
+            self._targets.append((owner, attribute, name, function))
+            if self.enabled:
+                setattr(owner, attribute, self.wrap(function, name))
+
+    def wrap(self, function, name):
+        record = self.record
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, started, time.perf_counter() - started)
+        return wrapper
+
+    def record(self, name, started, elapsed):
+        with self._lock:
+            self.counts[name] += 1
+            self.seconds[name] += elapsed
+            self.events.append((name, started, elapsed, threading.get_ident()))
+
+    def setEnabled(self, enabled):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        for owner, attribute, name, function in self._targets:
+            setattr(owner, attribute, self.wrap(function, name) if enabled else function)
+
+    def frame(self):
+        # 뷰가 한 번 그려질 때마다 부른다. 직전 그리기 이후의 호출 수를 lastFrame 에 남긴다
+        with self._lock:
+            counts = dict(self.counts)
+            self.lastFrame = {name: count - self._frameCounts.get(name, 0) for name, count in counts.items()
+                              if count != self._frameCounts.get(name, 0)}
+            self._frameCounts = counts
+            self.frames += 1
+
+    def summary(self):
+        # 이름별로 (전체 호출 수, 호출당 ms, 마지막 그리기 동안의 호출 수)
+        with self._lock:
+            return [(name, count, 1000.0 * self.seconds[name] / count, self.lastFrame.get(name, 0))
+                    for name, count in sorted(self.counts.items())]
+
+    def summaryText(self):
+        parts = []
+        for name, count, milliseconds, perFrame in self.summary():
+            part = '%s %.3f ms' % (name, milliseconds)
+            if perFrame:
+                part += ' %d/paint' % perFrame
+            parts.append(part)
+        return ', '.join(parts)
+
+    def exportTrace(self, fileName):
+        # chrome://tracing, Perfetto 에서 여는 Trace Event 형식 (ts, dur 은 마이크로초)
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace = [{'name': name, 'cat': 'dCairosEditor', 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': round((started - self._origin) * 1e6, 3), 'dur': round(elapsed * 1e6, 3)}
+                 for name, started, elapsed, tid in events]
+        with open(fileName, 'w', encoding='utf-8') as handle:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, handle)
+        return len(trace)
+
+
+profiler = Profiler()
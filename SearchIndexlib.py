@@ -0,0 +1,227 @@
+import bisect
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from CsvIOlib import CsvReader, fileKey
+from FilterEnginelib import toText
+
+INDEX_SUFFIX = '.index.npz'
+INDEX_VERSION = 1
+TOKEN = re.compile(r'\w+')
+
+
+def normalize(text):
+    # macOS 등에서 온 NFD 한글(자모 분리)도 같은 글자로 찾도록 NFC 로 맞춘다
+    return unicodedata.normalize('NFC', text).lower()
+
+
+def ngrams(text):
+    # 한글은 형태소 분석 없이 1, 2 글자 단위로 색인한다
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex(object):
+    def __init__(self):
+        # 셀 문자열은 고유값 사전(_values)의 번호로만 보관하고, n-gram/토큰은 고유값 번호를 가리킨다
+        self._values = []
+        self._valueIds = dict()
+        self._grams = defaultdict(set)
+        self._tokens = defaultdict(set)
+        self._sortedTokens = None
+        self._ids = []
+        self._postings = dict()
+
+    @classmethod
+    def fromFrame(cls, df):
+        index = cls()
+        index._ids = [index.valueIds(toText(df.iloc[:, column])) for column in range(len(df.columns))]
+        return index
+
+    def rowCount(self):
+        return len(self._ids[0]) if self._ids else 0
+
+    def valueId(self, text):
+        text = normalize(text)
+        valueId = self._valueIds.get(text)
+        if valueId is None:
+            valueId = self._valueIds[text] = len(self._values)
+            self._values.append(text)
+            self.addGrams(valueId, text)
+        return valueId
+
+    def addGrams(self, valueId, text):
+        for gram in ngrams(text):
+            self._grams[gram].add(valueId)
+        for token in TOKEN.findall(text):
+            if token not in self._tokens:
+                self._sortedTokens = None
+            self._tokens[token].add(valueId)
+
+    def valueIds(self, texts):
+        # 같은 문자열이 반복되므로 고유값만 사전에 넣는다
+        codes, uniques = pd.factorize(np.asarray(texts, dtype=object))
+        lookup = np.fromiter((self.valueId(text) for text in uniques), dtype=np.int32, count=len(uniques))
+        return lookup[codes]
+
+    def setCells(self, column, rows, texts):
+        self._ids[column][rows] = self.valueIds(texts)
+        self._postings.pop(column, None)
+
+    def insertRows(self, position, columns):
+        for column, texts in enumerate(columns):
+            self._ids[column] = np.insert(self._ids[column], position, self.valueIds(texts))
+        self._postings.clear()
+
+    def removeRows(self, first, last):
+        for column, ids in enumerate(self._ids):
+            self._ids[column] = np.delete(ids, np.s_[first:last + 1])
+        self._postings.clear()
+
+    def keepRows(self, keep):
+        for column, ids in enumerate(self._ids):
+            self._ids[column] = ids[keep]
+        self._postings.clear()
+
+    def permute(self, order):
+        for column, ids in enumerate(self._ids):
+            self._ids[column] = ids[order]
+        self._postings.clear()
+
+    def posting(self, column):
+        posting = self._postings.get(column)
+        if posting is None:
+            ids = self._ids[column]
+            order = np.argsort(ids, kind='stable')
+            posting = self._postings[column] = (ids[order], order)
+        return posting
+
+    def rowsFor(self, valueIds):
+        valueIds = np.sort(np.fromiter(valueIds, dtype=np.int32, count=len(valueIds)))
+        rows = []
+        for column in range(len(self._ids)):
+            sortedIds, order = self.posting(column)
+            starts = np.searchsorted(sortedIds, valueIds, 'left')
+            ends = np.searchsorted(sortedIds, valueIds, 'right')
+            rows.extend(order[start:end] for start, end in zip(starts, ends) if end > start)
+        if not rows:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(rows))
+
+    def matchValues(self, query):
+        query = normalize(query)
+        if not query:
+            return set()
+        grams = ngrams(query) if len(query) == 1 else {query[i:i + 2] for i in range(len(query) - 1)}
+        candidates = None
+        for gram in sorted(grams, key=lambda gram: len(self._grams.get(gram, ()))):
+            valueIds = self._grams.get(gram)
+            if not valueIds:
+                return set()
+            candidates = set(valueIds) if candidates is None else candidates & valueIds
+        return {valueId for valueId in candidates if query in self._values[valueId]}
+
+    def tokensWithPrefix(self, prefix):
+        if self._sortedTokens is None:
+            self._sortedTokens = sorted(self._tokens)
+        start = bisect.bisect_left(self._sortedTokens, prefix)
+        end = bisect.bisect_left(self._sortedTokens, prefix + '\U0010ffff')
+        return self._sortedTokens[start:end]
+
+    def search(self, query):
+        # 셀 어딘가에 query 가 부분 문자열로 들어 있는 행
+        return self.rowsFor(self.matchValues(query))
+
+    def searchKeywords(self, query):
+        # 모든 키워드가 (어느 열이든) 토큰의 앞부분으로 나오는 행. '계정' 은 '계정을' 에도 맞는다
+        rows = None
+        for keyword in TOKEN.findall(normalize(query)):
+            valueIds = set()
+            for token in self.tokensWithPrefix(keyword):
+                valueIds |= self._tokens[token]
+            matched = self.rowsFor(valueIds)
+            rows = matched if rows is None else np.intersect1d(rows, matched)
+        return rows if rows is not None else np.empty(0, dtype=np.intp)
+
+    def save(self, fileName):
+        directory, base = os.path.split(os.path.abspath(fileName))
+        handle, tmp = tempfile.mkstemp(prefix=base + '.', suffix='.npz', dir=directory)
+        key = fileKey(fileName)
+        try:
+            with os.fdopen(handle, 'wb') as stream:
+                np.savez(stream, version=np.array(INDEX_VERSION), key=np.array([key['mtime'], key['size']]),
+                         values=np.array(json.dumps(self._values, ensure_ascii=False)),
+                         **{'ids%d' % column: ids for column, ids in enumerate(self._ids)})
+            os.replace(tmp, fileName + INDEX_SUFFIX)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, fileName):
+        key = fileKey(fileName)
+        try:
+            with np.load(fileName + INDEX_SUFFIX) as stored:
+                if int(stored['version']) != INDEX_VERSION or \
+                        stored['key'].tolist() != [key['mtime'], key['size']]:
+                    return None
+                values = json.loads(str(stored['values']))
+                columns = sorted((name for name in stored.files if name.startswith('ids')),
+                                 key=lambda name: int(name[3:]))
+                ids = [stored[name].astype(np.int32) for name in columns]
+        except (OSError, ValueError, KeyError):
+            return None
+        index = cls()
+        index._values = values
+        index._valueIds = {text: valueId for valueId, text in enumerate(values)}
+        for valueId, text in enumerate(values):
+            index.addGrams(valueId, text)
+        index._ids = ids
+        return index
+
+
+class CorpusIndex(object):
+    # csv/BaseLine, csv/BaseReport 처럼 여러 디렉터리의 CSV 전체를 검색한다
+    def __init__(self, directories):
+        self.directories = directories
+        self.indexes = dict()
+
+    def build(self):
+        for directory in self.directories:
+            for fileName in sorted(glob.glob(os.path.join(directory, '*.csv'))):
+                index = SearchIndex.load(fileName)
+                if index is None:
+                    index = SearchIndex.fromFrame(CsvReader(fileName).read())
+                    try:
+                        index.save(fileName)
+                    except OSError:
+                        pass
+                self.indexes[fileName] = index
+        return self
+
+    def search(self, query, keywords=False):
+        results = dict()
+        for fileName, index in self.indexes.items():
+            rows = index.searchKeywords(query) if keywords else index.search(query)
+            if len(rows):
+                results[fileName] = rows
+        return results
+
+
+if __name__ == "__main__":
+    basedir = os.path.abspath(os.path.dirname(__file__))
+    corpus = CorpusIndex([os.path.join(basedir, 'csv', 'BaseLine'),
+                          os.path.join(basedir, 'csv', 'BaseReport')]).build()
+    for fileName, rows in corpus.search(' '.join(sys.argv[1:])).items():
+        df = CsvReader(fileName).read()
+        print(fileName)
+        print(df.iloc[rows].to_string())
@@ -0,0 +1,39 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+DIGITS = re.compile(r'[0-9]+')
+NUMBER = r'\s*[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?\s*'
+PADDING = 20
+
+
+def naturalKeys(texts):
+    # 숫자 부분을 같은 길이로 0 을 채우면 문자열 비교가 자연 정렬이 된다 ('U-2' < 'U-10')
+    series = pd.Series(texts, dtype=object).str.lower()
+    return series.str.replace(DIGITS, lambda match: match.group(0).zfill(PADDING),
+                              regex=True).to_numpy(dtype=object)
+
+
+def columnRanks(values):
+    # 행마다 정렬 순위 (빈 값은 맨 뒤). 숫자 열은 값 순서, 문자열 열은 숫자로 읽히는 값(설정값 등)을
+    # 먼저 값 순서로 두고 나머지는 자연 정렬한다. 고유값만 정렬하므로 반복되는 값이 많을수록 빠르다
+    series = pd.Series(values, copy=False)
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        codes, uniques = pd.factorize(series, sort=True)
+        ranks = np.arange(len(uniques) + 1)
+    else:
+        codes, uniques = pd.factorize(series)
+        texts = pd.Series([str(value) for value in uniques], dtype=object)
+        numbers = np.full(len(texts), np.nan)
+        numeric = np.array(texts.str.fullmatch(NUMBER), dtype=bool)
+        numbers[numeric] = pd.to_numeric(texts[numeric], errors='coerce')
+        numeric = ~np.isnan(numbers)
+        keys = naturalKeys(texts[~numeric])
+        order = np.concatenate([np.flatnonzero(numeric)[np.argsort(numbers[numeric], kind='stable')],
+                                np.flatnonzero(~numeric)[np.argsort(keys, kind='stable')]])
+        ranks = np.empty(len(uniques) + 1, dtype=np.int64)
+        ranks[order] = np.arange(len(uniques))
+        ranks[-1] = len(uniques)
+    # factorize 는 빈 값을 -1 로 돌려준다
+    return ranks[codes]
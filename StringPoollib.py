@@ -0,0 +1,57 @@
+import threading
+
+import pandas as pd
+
+from CsvIOlib import isNumeric
+
+# 첫 청크에서 고유값이 행 수의 이 비율 이하인 문자열 열은 범주형으로 읽는다
+CATEGORY_RATIO = 0.5
+
+
+class StringPool(object):
+    # 열린 파일들이 같이 쓰는 문자열 풀과 열 이름별 범주 dtype.
+    # 같은 열 이름은 같은 범주 dtype 을 쓰고, 새 값은 범주 뒤에 덧붙이므로 기존 범주 번호는 그대로다
+    def __init__(self):
+        self._strings = dict()
+        self._dtypes = dict()
+        # 여러 탭이 작업 스레드에서 동시에 불러올 수 있다
+        self._lock = threading.Lock()
+
+    def intern(self, values):
+        return [self._strings.setdefault(value, value) if isinstance(value, str) else value
+                for value in values]
+
+    def categoryColumns(self, df):
+        columns = []
+        for column in range(len(df.columns)):
+            series = df.iloc[:, column]
+            if isNumeric(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if series.nunique() <= max(1, len(series.index) * CATEGORY_RATIO):
+                columns.append(column)
+        return columns
+
+    def categoryDtype(self, name, values):
+        with self._lock:
+            return self.updateDtype(name, values)
+
+    def updateDtype(self, name, values):
+        dtype = self._dtypes.get(name)
+        categories = dtype.categories if dtype is not None else pd.Index([], dtype=object)
+        missing = pd.Index(values, dtype=object).difference(categories)
+        if dtype is None or len(missing):
+            dtype = self._dtypes[name] = pd.CategoricalDtype(
+                pd.Index(categories.tolist() + self.intern(missing), dtype=object))
+        return dtype
+
+    def categorize(self, df, columns):
+        if not columns:
+            return df
+        df = df.copy(deep=False)
+        for column in columns:
+            series = df.iloc[:, column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            dtype = self.categoryDtype(str(df.columns[column]), series.dropna().unique())
+            df.isetitem(column, pd.Categorical(series, dtype=dtype))
+        return df
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from SortKeylib import columnRanks
+
+
+class ColumnValues(object):
+    # 한 열의 고유값 색인: 행마다 고유값 번호(codes)를 두고 고유값별 행 수(counts)를 함께 고친다.
+    # 값 하나의 행 비트맵은 codes 를 비교해 바로 만든다
+    def __init__(self, texts):
+        self.values = []
+        self._codes = dict()
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._order = None
+        self.codes = self.encode(texts)
+        self.count(self.codes, 1)
+
+    def encode(self, texts):
+        codes, uniques = pd.factorize(np.asarray(texts, dtype=object))
+        if not self.values:
+            self.values = list(uniques)
+            self._codes = {text: code for code, text in enumerate(self.values)}
+            return codes.astype(np.int32)
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for number, text in enumerate(uniques):
+            code = self._codes.get(text)
+            if code is None:
+                code = self._codes[text] = len(self.values)
+                self.values.append(text)
+                self._order = None
+            lookup[number] = code
+        return lookup[codes]
+
+    def count(self, codes, step):
+        if len(self.counts) < len(self.values):
+            self.counts = np.concatenate([self.counts, np.zeros(len(self.values) - len(self.counts), dtype=np.int64)])
+        np.add.at(self.counts, codes, step)
+
+    def setCells(self, rows, texts):
+        # rows 는 겹치지 않는 행 번호 배열
+        self.count(self.codes[rows], -1)
+        self.codes[rows] = self.encode(texts)
+        self.count(self.codes[rows], 1)
+
+    def insertRows(self, position, texts):
+        codes = self.encode(texts)
+        self.codes = np.insert(self.codes, position, codes)
+        self.count(codes, 1)
+
+    def removeRows(self, first, last):
+        self.count(self.codes[first:last + 1], -1)
+        self.codes = np.delete(self.codes, np.s_[first:last + 1])
+
+    def keepRows(self, keep):
+        self.count(self.codes[~keep], -1)
+        self.codes = self.codes[keep]
+
+    def permute(self, order):
+        self.codes = self.codes[order]
+
+    def items(self):
+        # 고유값 배열과 행 수 배열을 정렬 순서대로. 행이 없어진 값은 뺀다
+        if self._order is None:
+            self._order = np.argsort(columnRanks(pd.Series(self.values, dtype=object)), kind='stable')
+        order = self._order[self.counts[self._order] > 0]
+        return np.asarray(self.values, dtype=object)[order], self.counts[order]
+
+    def mask(self, values):
+        codes = [self._codes[value] for value in values if value in self._codes]
+        return np.isin(self.codes, codes)
+
+    def rows(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.codes == code)
@@ -0,0 +1,126 @@
+import sys
+import os
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Qt 없이 동작해야 하므로 PyQt5 를 가져오는 모듈은 쓰지 않는다
+from CsvIOlib import CsvReader, writeCsv
+from FilterEnginelib import frameMask
+from Compliancelib import PASS, FAIL, REPORT_RESULT, applyCompliance
+
+
+def findInputs(patterns):
+    fileNames = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            fileNames.extend(sorted(glob.glob(os.path.join(pattern, '*.csv'))))
+        else:
+            fileNames.extend(sorted(glob.glob(pattern)))
+    # 패턴이 겹쳐 같은 파일이 두 번 나오면 한 번만 처리한다
+    seen = set()
+    return [fileName for fileName in fileNames
+            if not (os.path.abspath(fileName) in seen or seen.add(os.path.abspath(fileName)))]
+
+
+def outputNames(fileNames):
+    # 입력 -> 출력 폴더 안의 상대 경로. 파일 이름이 겹치면 (siteA/web01.csv, siteB/web01.csv)
+    # 그 파일들의 공통 폴더 기준 상대 경로를 써서 서로 덮어쓰지 않게 한다
+    paths = {fileName: os.path.abspath(fileName) for fileName in fileNames}
+    names = {fileName: os.path.basename(path) for fileName, path in paths.items()}
+    groups = dict()
+    for fileName, name in names.items():
+        groups.setdefault(os.path.normcase(name), []).append(fileName)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        root = os.path.commonpath([os.path.dirname(paths[fileName]) for fileName in group])
+        names.update((fileName, os.path.relpath(paths[fileName], root)) for fileName in group)
+    return names
+
+
+def findBaseline(baseline, fileName):
+    if baseline is None or not os.path.isdir(baseline):
+        return baseline
+    path = os.path.join(baseline, os.path.basename(fileName))
+    return path if os.path.exists(path) else None
+
+
+def parseFilters(filters, columns):
+    expresions = dict()
+    for item in filters:
+        name, _, expresion = item.partition('=')
+        if name in columns:
+            column = columns.get_loc(name)
+        else:
+            column = int(name)
+        expresions[column] = expresion
+    return expresions
+
+
+def processFile(task):
+    fileName, output, baseline, filters, useCache = task
+    started = time.time()
+    summary = {'file': fileName, 'output': output, 'rows': 0, 'saved': 0, 'pass': 0, 'fail': 0, 'seconds': 0.0, 'error': ''}
+    try:
+        reader = CsvReader(fileName, useCache=useCache)
+        df = reader.read()
+        summary['rows'] = len(df.index)
+        if baseline is not None and REPORT_RESULT in df.columns:
+            column, _ = applyCompliance(df, CsvReader(baseline, useCache=useCache).read())
+            df.isetitem(df.columns.get_loc(REPORT_RESULT), column)
+        if filters:
+            df = df[frameMask(df, parseFilters(filters, df.columns))]
+        if REPORT_RESULT in df.columns:
+            summary['pass'] = int((df[REPORT_RESULT] == PASS).sum())
+            summary['fail'] = int((df[REPORT_RESULT] == FAIL).sum())
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        writeCsv(output, reader.header, df)
+        summary['saved'] = len(df.index)
+    except Exception as e:
+        summary['error'] = '%s: %s' % (type(e).__name__, e)
+    summary['seconds'] = round(time.time() - started, 3)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='dCairosEditor batch mode (no Qt)')
+    parser.add_argument('inputs', nargs='+', help='report CSV files, directories or glob patterns')
+    parser.add_argument('-o', '--output', required=True, help='directory for processed CSV files')
+    parser.add_argument('-b', '--baseline', help='BaseLine CSV, or a directory of BaseLine CSVs matched by file name')
+    parser.add_argument('-f', '--filter', action='append', default=[],
+                        help='COLUMN=REGEX, COLUMN is a column name or number (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes')
+    parser.add_argument('--summary', default='summary.csv', help='summary file name inside the output directory')
+    parser.add_argument('--no-cache', dest='cache', action='store_false', help='do not use the binary sidecar cache')
+    args = parser.parse_args(argv)
+
+    fileNames = findInputs(args.inputs)
+    if not fileNames:
+        parser.error('no CSV files found')
+    outputs = {fileName: os.path.join(args.output, name) for fileName, name in outputNames(fileNames).items()}
+    # 출력 폴더가 입력 폴더와 같아도 입력 파일이나 요약 파일은 덮어쓰지 않는다
+    protected = {os.path.normcase(os.path.abspath(fileName)) for fileName in fileNames}
+    protected.add(os.path.normcase(os.path.abspath(os.path.join(args.output, args.summary))))
+    for output in outputs.values():
+        if os.path.normcase(os.path.abspath(output)) in protected:
+            parser.error('output %s would overwrite an input or the summary file' % output)
+    os.makedirs(args.output, exist_ok=True)
+
+    tasks = [(fileName, outputs[fileName], findBaseline(args.baseline, fileName), args.filter, args.cache)
+             for fileName in fileNames]
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        summaries = list(executor.map(processFile, tasks))
+
+    summary = pd.DataFrame(summaries)
+    summary.to_csv(os.path.join(args.output, args.summary), index=False)
+    failed = summary['error'] != ''
+    print('%d files, %d rows, %d failed' % (len(summary.index), summary['rows'].sum(), failed.sum()))
+    return 1 if failed.any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+
+from CsvIOlib import CsvReader, writeCsv
+from PandasModellib import PandasModel
+from dCairosEditor import CustomProxyModel
+
+# BaseReport 와 같은 열: 항목코드, 점검항목, 중요도, 설정이름, 설정값, 점검결과, 권고사항
+HEADER = ['항목코드', '점검항목', '중요도', '설정이름', '설정값', '점검결과', '권고사항']
+ITEMS = ['root 계정 원격 접속 제한', '패스워드 복잡성 설정', '계정 잠금 임계값 설정', '패스워드 최대 사용 기간 설정',
+         'IIS 서비스 구동 점검', 'IIS 불필요한 파일 제거', 'Administrator 계정 이름 바꾸기', 'GUEST 계정 상태',
+         '패스워드의 주기적 변경', '화면보호기 설정', '공유 폴더 제거', '불필요한 서비스 중지']
+SETTINGS = ['PermitRootLogin', 'minlen', 'lcredit', 'PASS_MAX_DAYS', 'deny', 'EnableGuestAccount',
+            'MaximumPasswordAge', 'ScreenSaveTimeOut', '', '']
+ADVICE = ['PermitRootLogin: no or NoData', 'lcredit : -1 and ucredit : -1 and dcredit : -1 and minlen : 8',
+          'MaximumPasswordAge 90', '불필요한 서비스 중지', 'Administrator 계정 이름 변경', '불필요한 파일 없음',
+          'deny 5 이하', '화면보호기 대기 시간 600 초 이하 설정']
+GENERATE_CHUNKSIZE = 1000000
+
+
+def generateReport(fileName, rows, seed=0):
+    # 첫 줄은 열 번호, 둘째 줄은 열 이름인 BaseReport 형식. 천만 행도 메모리에 다 올리지 않고 나눠 쓴다
+    rng = np.random.default_rng(seed)
+    with open(fileName, 'w', encoding='utf-8', newline='') as handle:
+        handle.write(','.join(str(column) for column in range(len(HEADER))) + os.linesep)
+        handle.write(','.join(HEADER) + os.linesep)
+        for start in range(0, rows, GENERATE_CHUNKSIZE):
+            count = min(GENERATE_CHUNKSIZE, rows - start)
+            prefix = rng.choice(np.array(['U', 'W', 'PC', 'IIS']), count)
+            number = rng.integers(1, 80, count)
+            values = rng.integers(-1, 1000, count).astype(str)
+            # 설정값의 일부는 글자('이상', '콘솔' 등)
+            values = np.where(rng.random(count) < 0.2, rng.choice(np.array(['이상', '콘솔', 'NoData', '']), count),
+                              values)
+            df = pd.DataFrame({
+                HEADER[0]: np.char.add(np.char.add(prefix, '-'), np.char.zfill(number.astype(str), 2)),
+                HEADER[1]: rng.choice(np.array(ITEMS), count),
+                HEADER[2]: rng.choice(np.array(['상', '중', '하']), count),
+                HEADER[3]: rng.choice(np.array(SETTINGS), count),
+                HEADER[4]: values,
+                HEADER[5]: rng.choice(np.array(['양호', '취약', '']), count),
+                HEADER[6]: rng.choice(np.array(ADVICE), count),
+            })
+            df.to_csv(handle, header=False, index=False, lineterminator=os.linesep)
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000.0
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return {'count': len(samples), 'mean_ms': float(samples.mean()), 'p50_ms': float(p50),
+            'p90_ms': float(p90), 'p99_ms': float(p99), 'max_ms': float(samples.max())}
+
+
+def measure(function, repeat, memory=True):
+    # 시간은 tracemalloc 없이 재고, 최대 메모리는 한 번 더 실행해서 잰다 (numpy 할당 포함)
+    samples = []
+    for number in range(repeat):
+        started = time.perf_counter()
+        function(number)
+        samples.append(time.perf_counter() - started)
+    result = percentiles(samples)
+    if memory:
+        tracemalloc.start()
+        try:
+            function(repeat)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def loadModel(fileName, useCache=False):
+    # 편집기와 같은 순서: 첫 청크로 모델을 만들고 나머지 청크를 이어 붙인다
+    reader = CsvReader(fileName, useCache=useCache)
+    chunks = reader.chunks()
+    model = PandasModel(next(chunks), copy=False)
+    proxy = CustomProxyModel()
+    proxy.setSourceModel(model)
+    for chunk in chunks:
+        model.appendFrame(chunk)
+    return reader, model, proxy
+
+
+def benchmark(fileName, repeat, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    results = dict()
+    results['load'] = measure(lambda number: loadModel(fileName), repeat)
+    loadModel(fileName, useCache=True)
+    results['load_cached'] = measure(lambda number: loadModel(fileName, useCache=True), repeat)
+
+    reader, model, proxy = loadModel(fileName, useCache=True)
+    rowCount, columnCount = model.rowCount(), model.columnCount()
+
+    cells = [model.index(int(row), int(column)) for row, column in
+             zip(rng.integers(0, rowCount, samples), rng.integers(0, columnCount, samples))]
+    results['data'] = measure(lambda number: model.data(cells[number % samples], Qt.DisplayRole),
+                              samples, memory=False)
+
+    expresions = ['U-0%d' % (number % 10) for number in range(repeat + 1)]
+    def applyFilter(number):
+        proxy.setFilter(expresions[number], 0)
+        proxy.rowCount()
+    results['filter'] = measure(applyFilter, repeat)
+    # 걸러진 상태에서 원본 행 하나를 보이는 행으로 찾는 비용 (선택, 영구 인덱스가 쓴다)
+    sources = [model.index(int(row), 0) for row in rng.integers(0, rowCount, samples)]
+    results['mapFromSource'] = measure(lambda number: proxy.mapFromSource(sources[number % samples]),
+                                       samples, memory=False)
+    proxy.setFilter('', 0)
+
+    results['sort'] = measure(lambda number: model.sort(number % columnCount, Qt.AscendingOrder
+                                                        if number // columnCount % 2 == 0 else Qt.DescendingOrder),
+                              repeat * 2)
+    results['insert'] = measure(lambda number: model.insertRows(int(rng.integers(0, model.rowCount())), 100), repeat)
+    results['remove'] = measure(lambda number: model.removeRows(int(rng.integers(0, model.rowCount() - 100)), 100),
+                                repeat)
+
+    directory = tempfile.mkdtemp(prefix='dCairosBench.')
+    try:
+        target = os.path.join(directory, 'save.csv')
+        results['save'] = measure(lambda number: writeCsv(target, reader.header, model.frame()), repeat)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def peakRss():
+    # 리눅스에서만: 프로세스 전체의 최대 RSS
+    try:
+        with open('/proc/self/status') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def compare(previous, current):
+    # 이전 결과 대비 p50 비율 (1 보다 크면 느려졌다)
+    for rows, results in current['runs'].items():
+        old = previous.get('runs', {}).get(rows, {})
+        for name, result in results.items():
+            if name in old and old[name]['p50_ms'] > 0:
+                ratio = result['p50_ms'] / old[name]['p50_ms']
+                print('%10s %-18s p50 %10.3f ms -> %10.3f ms  x%.2f' % (rows, name, old[name]['p50_ms'],
+                                                                        result['p50_ms'], ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='dCairosEditor benchmarks (headless)')
+    parser.add_argument('-n', '--rows', type=int, nargs='+', default=[1000, 100000],
+                        help='synthetic report sizes, 1000 to 10000000')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='runs per operation')
+    parser.add_argument('-s', '--samples', type=int, default=10000, help='calls for per-cell operations')
+    parser.add_argument('-o', '--output', default='bench.json', help='JSON result file')
+    parser.add_argument('-c', '--compare', help='earlier JSON result to compare against')
+    parser.add_argument('--data', help='directory to keep generated CSV files in')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    directory = args.data or tempfile.mkdtemp(prefix='dCairosBench.')
+    os.makedirs(directory, exist_ok=True)
+    report = {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+              'platform': platform.platform(), 'repeat': args.repeat, 'samples': args.samples, 'runs': dict()}
+    try:
+        for rows in args.rows:
+            fileName = os.path.join(directory, 'report_%d.csv' % rows)
+            if not os.path.exists(fileName):
+                generateReport(fileName, rows)
+            started = time.time()
+            report['runs'][str(rows)] = benchmark(fileName, args.repeat, args.samples)
+            print('%d rows: %.1f s' % (rows, time.time() - started))
+    finally:
+        if args.data is None:
+            shutil.rmtree(directory, ignore_errors=True)
+    report['peak_rss_bytes'] = peakRss()
+
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            compare(json.load(handle), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,107 +1,802 @@
 import sys
 import os
+import threading
 import numpy as np
 import pandas as pd
 from PyQt5 import QtCore
 from PyQt5.QtGui import QFont
 from PandasModellib import PandasModel
-from PyQt5.QtWidgets import QWidget, QTableView, QLineEdit, QPushButton, QButtonGroup, QHBoxLayout, QGridLayout
+from CsvIOlib import CsvReader, WriteCancelled, fileKey, writeCsv
+from Compliancelib import BASELINE_COLUMNS, REPORT_COLUMNS, REPORT_RESULT, applyCompliance, missingColumns
+from SearchIndexlib import SearchIndex
+from FilterEnginelib import ColumnFilterEngine, compileFilter, chunkedColumnMask, frameMask, toText
+from ValueIndexlib import ColumnValues
+from StringPoollib import StringPool
+from Profilerlib import profiler
+from ChangeLoglib import ChangeLog
+from FrameDifflib import diffFrames
+from PyQt5.QtWidgets import QWidget, QTableView, QLineEdit, QPushButton, QButtonGroup, QHBoxLayout, QGridLayout, QCheckBox
 from PyQt5.QtWidgets import QVBoxLayout, QFileDialog, QApplication, QDesktopWidget, QComboBox, QLabel, QMenu, QAction
-from PyQt5.QtCore import Qt, QRegExp, QSortFilterProxyModel, QModelIndex
+from PyQt5.QtWidgets import QWidgetAction, QListView, QTabWidget, QHeaderView, QMessageBox, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractProxyModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtCore import QAbstractListModel, QSignalMapper, QPoint, QEvent, QFileSystemWatcher
+from PyQt5.QtCore import QItemSelection, QItemSelectionRange, QPersistentModelIndex
 
+# 헤더 메뉴: 고유값이 MENUSIZE 개를 넘으면 검색 가능한 목록을 VALUEFETCHSIZE 개씩 채운다
+MENUSIZE = 200
+VALUEFETCHSIZE = 500
+# 열 폭은 앞쪽 SIZEROWS 행 중 처음 SIZESAMPLE 행과 가장 긴 SIZELONGEST 개 문자열로만 잰다
+SIZEROWS = 1000
+SIZESAMPLE = 100
+SIZELONGEST = 5
+MAXCOLUMNWIDTH = 480
+# 감시 중인 파일이 바뀐 뒤 이만큼(ms) 조용하면 다시 읽는다 (수집기가 나눠 쓰는 동안 읽지 않도록)
+RELOADDELAY = 500
+
+
+class FilterJobSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class FilterJob(QRunnable):
+    def __init__(self, generation, revision, expresion, column, values):
+        super().__init__()
+        self.generation = generation
+        self.revision = revision
+        self.expresion = expresion
+        self.column = column
+        self.values = values
+        self.mask = None
+        self.cancelled = False
+        self.signals = FilterJobSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        self.mask = chunkedColumnMask(compileFilter(self.expresion), self.values,
+                                      lambda: self.cancelled)
+        if self.mask is not None:
+            self.signals.finished.emit(self)
+
+
+class LoadJobSignals(QObject):
+    chunk = pyqtSignal(object, object)
+    progress = pyqtSignal(object, 'qlonglong', 'qlonglong')
+    finished = pyqtSignal(object)
+
+
+class LoadJob(QRunnable):
+    # 첫 청크 다음부터는 작업 스레드에서 읽는다. 읽은 청크는 시그널로 GUI 스레드에 넘기고 다시 건드리지 않는다
+    def __init__(self, reader, chunks, pool, categoryColumns, rows):
+        super().__init__()
+        self.reader = reader
+        self.chunks = chunks
+        self.pool = pool
+        self.categoryColumns = categoryColumns
+        self.rows = rows
+        self.error = None
+        self.cancelled = False
+        self.signals = LoadJobSignals()
+
+    def cancel(self):
+        self.cancelled = True
+        self.reader.cancel()
+
+    def run(self):
+        try:
+            for df in self.chunks:
+                if self.cancelled:
+                    break
+                df = self.pool.categorize(df, self.categoryColumns)
+                self.rows += len(df.index)
+                self.signals.chunk.emit(self, df)
+                self.signals.progress.emit(self, self.reader.bytesRead, self.rows)
+        except Exception as e:
+            self.error = '%s: %s' % (type(e).__name__, e)
+        finally:
+            self.chunks.close()
+            self.signals.finished.emit(self)
+
+
+class SaveJobSignals(QObject):
+    progress = pyqtSignal(object, 'qlonglong', 'qlonglong')
+    finished = pyqtSignal(object)
+
+
+class SaveJob(QRunnable):
+    # df 는 저장을 누른 시점의 스냅샷이다. copy-on-write 라서 이후의 편집은 이 사본에 영향이 없다
+    def __init__(self, fileName, header, df, source, revision):
+        super().__init__()
+        self.fileName = fileName
+        self.header = header
+        self.df = df
+        self.rows = len(df.index)
+        self.written = 0
+        self.source = source
+        self.revision = revision
+        self.error = None
+        self.cancelled = False
+        self.signals = SaveJobSignals()
+        # 닫을 때 GUI 스레드가 끝나기를 기다린다
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def progress(self, bytesWritten, rows):
+        self.written = rows
+        self.signals.progress.emit(self, bytesWritten, rows)
+
+    def run(self):
+        try:
+            if not self.cancelled:
+                writeCsv(self.fileName, self.header, self.df, self.progress, lambda: self.cancelled)
+        except WriteCancelled:
+            pass
+        except Exception as e:
+            self.error = '%s: %s' % (type(e).__name__, e)
+        finally:
+            self.df = None
+            self.signals.finished.emit(self)
+            self.done.set()
+
+
+class ValueListModel(QAbstractListModel):
+    def __init__(self, values, counts, parent=None):
+        super().__init__(parent)
+        self._values = values
+        self._counts = counts
+        self._texts = pd.Series(values, dtype=object)
+        self._matched = np.arange(len(values))
+        self._fetched = min(VALUEFETCHSIZE, len(self._matched))
+
+    @QtCore.pyqtSlot(str)
+    def setSearch(self, text):
+        self.beginResetModel()
+        if text:
+            self._matched = np.flatnonzero(np.array(
+                self._texts.str.contains(text, case=False, regex=False), dtype=bool))
+        else:
+            self._matched = np.arange(len(self._values))
+        self._fetched = min(VALUEFETCHSIZE, len(self._matched))
+        self.endResetModel()
+
+    def item(self, row):
+        row = self._matched[row]
+        return self._values[row], int(self._counts[row])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._fetched < len(self._matched)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(VALUEFETCHSIZE, len(self._matched) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return '%s (%d)' % self.item(index.row())
+        return None
+
+
+class CustomProxyModel(QAbstractProxyModel):
+    # 필터 마스크의 행 번호(np.flatnonzero)를 매핑으로 쓴다. 행마다 filterAcceptsRow 를 부르거나
+    # 빠진 구간마다 rowsRemoved 를 내지 않고, 걸러진 행 전체를 layoutChanged 한 번으로 바꿔 끼운다
+    filterStarted = pyqtSignal()
+    filterFinished = pyqtSignal()
 
-class CustomProxyModel(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._filters = dict()
+        self._engine = ColumnFilterEngine()
+        self._job = None
+        self._generation = 0
+        self._revision = 0
+        self._filterKeyColumn = 0
+        # 보이는 행 -> 원본 행 (오름차순). None 이면 거르지 않고 원본 행을 그대로 보인다
+        self._rows = None
+        self._layout = None
+        self._searchIndex = None
+        self._search = None
+        self._searchMask = None
+        # 열 번호 -> 고유값 색인(헤더 메뉴에서 처음 열 때 만든다), 열 번호 -> 고른 값들
+        self._values = dict()
+        self._valueFilters = dict()
+        self._valueMask = None
+        # 바뀐 셀 범위 (first, last, columns). setRows 가 구간마다 알려도 색인 갱신과 매핑은
+        # 이벤트 루프로 돌아간 뒤 한 번에 한다
+        self._changed = []
+        self._changeTimer = QTimer(self)
+        self._changeTimer.setSingleShot(True)
+        self._changeTimer.setInterval(0)
+        self._changeTimer.timeout.connect(self.on_changeTimer_timeout)
 
     @property
     def filters(self):
-        return self._filters
+        return self._engine.expresions
+
+    def sourceSignals(self, model):
+        return [(model.dataChanged, self.on_source_dataChanged),
+                (model.headerDataChanged, self.on_source_headerDataChanged),
+                (model.rowsAboutToBeInserted, self.on_source_rowsAboutToBeInserted),
+                (model.rowsInserted, self.on_source_rowsInserted),
+                (model.rowsAboutToBeRemoved, self.on_source_rowsAboutToBeRemoved),
+                (model.rowsRemoved, self.on_source_rowsRemoved),
+                (model.rowsPermuted, self.on_source_rowsPermuted),
+                (model.rowsKept, self.on_source_rowsKept),
+                (model.layoutAboutToBeChanged, self.on_source_layoutAboutToBeChanged),
+                (model.layoutChanged, self.on_source_layoutChanged),
+                (model.modelAboutToBeReset, self.beginResetModel),
+                (model.modelReset, self.on_source_reset)]
+
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        previous = self.sourceModel()
+        if previous is not None:
+            for signal, slot in self.sourceSignals(previous):
+                signal.disconnect(slot)
+        for signal, slot in self.sourceSignals(model):
+            signal.connect(slot)
+        self._engine.invalidate()
+        self._changed = []
+        super().setSourceModel(model)
+        mask = self.filterMask()
+        self._rows = None if mask is None else np.flatnonzero(mask)
+        self.endResetModel()
+
+    def filterKeyColumn(self):
+        return self._filterKeyColumn
+
+    def setFilterKeyColumn(self, column):
+        self._filterKeyColumn = column
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index):
+        return QModelIndex()
+
+    def hasChildren(self, parent=QModelIndex()):
+        return not parent.isValid() and self.rowCount() > 0
+
+    def rowCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        if parent.isValid() or model is None:
+            return 0
+        return model.rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        if parent.isValid() or model is None:
+            return 0
+        return model.columnCount()
+
+    def sourceRow(self, row):
+        return row if self._rows is None else int(self._rows[row])
+
+    def proxyRow(self, sourceRow):
+        # 걸러진 원본 행이면 -1
+        if self._rows is None:
+            return sourceRow
+        position = int(np.searchsorted(self._rows, sourceRow))
+        return position if position < len(self._rows) and self._rows[position] == sourceRow else -1
+
+    def proxyRange(self, first, last):
+        # 원본 행 first..last 중 보이는 행들의 범위 (매핑이 오름차순이라 이어져 있다). 없으면 first > last
+        if self._rows is None:
+            return first, last
+        return int(np.searchsorted(self._rows, first)), int(np.searchsorted(self._rows, last, 'right')) - 1
+
+    def mapToSource(self, proxyIndex):
+        if not proxyIndex.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.sourceRow(proxyIndex.row()), proxyIndex.column())
+
+    def mapFromSource(self, sourceIndex):
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        return self.index(self.proxyRow(sourceIndex.row()), sourceIndex.column())
+
+    def mapSelectionToSource(self, selection):
+        # 셀마다 옮기지 않고 선택 범위를 이어지는 원본 행 구간으로 묶는다
+        model = self.sourceModel()
+        result = QItemSelection()
+        for selectionRange in selection:
+            rows = np.arange(selectionRange.top(), selectionRange.bottom() + 1)
+            if self._rows is not None:
+                rows = self._rows[rows]
+            if not len(rows):
+                continue
+            for block in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1):
+                result.append(QItemSelectionRange(model.index(int(block[0]), selectionRange.left()),
+                                                  model.index(int(block[-1]), selectionRange.right())))
+        return result
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        model = self.sourceModel()
+        return model.data(model.index(self.sourceRow(index.row()), index.column()), role)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        # 세로 헤더는 원본 행 번호를 보인다
+        if orientation == Qt.Vertical and 0 <= section < self.rowCount():
+            section = self.sourceRow(section)
+        return self.sourceModel().headerData(section, orientation, role)
 
     def setFilter(self, expresion, column):
-        if expresion:
-            self.filters[column] = expresion
-        elif column in self.filters:
-            del self.filters[column]
+        if self._engine.setFilter(expresion, column):
+            self.invalidateFilter()
+
+    def setFilterAsync(self, expresion, column):
+        # 새 입력이 들어오면 이전 작업은 취소되고 결과는 버려진다
+        self._generation += 1
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        if not expresion or self._engine.hasMask(expresion, column):
+            self.setFilter(expresion, column)
+            self.filterFinished.emit()
+            return
+        job = FilterJob(self._generation, self._revision, expresion, column,
+                        self.columnText(column))
+        job.signals.finished.connect(self.on_job_finished)
+        self._job = job
+        self.filterStarted.emit()
+        QThreadPool.globalInstance().start(job)
+
+    def setSearch(self, index, query, keywords=False):
+        self._searchIndex = index
+        self._search = (query, keywords) if query else None
+        self._searchMask = None
         self.invalidateFilter()
 
-    def filterAcceptsRow(self, source_row, source_parent):
-        for column, expresion in self.filters.items():
-            text = self.sourceModel().index(source_row, column, source_parent).data()
-            regex = QRegExp(expresion, Qt.CaseInsensitive, QRegExp.RegExp)
-            if regex.indexIn(text) == -1:
-                return False
-        return True
+    def searchMask(self, rowCount):
+        if self._search is None:
+            return None
+        self.flushChanges()
+        if self._searchMask is None or len(self._searchMask) != rowCount:
+            query, keywords = self._search
+            if keywords:
+                rows = self._searchIndex.searchKeywords(query)
+            else:
+                rows = self._searchIndex.search(query)
+            self._searchMask = np.zeros(rowCount, dtype=bool)
+            self._searchMask[rows[rows < rowCount]] = True
+        return self._searchMask
+
+    def columnValues(self, column):
+        self.flushChanges()
+        values = self._values.get(column)
+        if values is None:
+            values = self._values[column] = ColumnValues(self.columnText(column))
+        return values
+
+    def setValueFilter(self, column, values):
+        # 정규식 없이 고유값 색인의 행 비트맵으로 거른다
+        if values:
+            self._valueFilters[column] = set(values)
+        else:
+            self._valueFilters.pop(column, None)
+        self._valueMask = None
+        self.invalidateFilter()
+
+    def valueMask(self, rowCount):
+        if not self._valueFilters:
+            return None
+        if self._valueMask is None or len(self._valueMask) != rowCount:
+            mask = np.ones(rowCount, dtype=bool)
+            for column, values in self._valueFilters.items():
+                mask &= self.columnValues(column).mask(values)
+            self._valueMask = mask
+        return self._valueMask
+
+    def acceptedRows(self):
+        self.flushChanges()
+        model = self.sourceModel()
+        rowCount = model.totalRowCount()
+        if model.rowCount() == rowCount:
+            masks = [self._engine.mask(self.columnText, rowCount), self.valueMask(rowCount)]
+        else:
+            # 가상 모드에서는 아직 노출되지 않은 행까지 계산한다
+            frame = model.frame()
+            masks = [frameMask(frame, self.filters) if self.filters else None]
+            masks += [np.isin(toText(frame.iloc[:, column]), list(values))
+                      for column, values in self._valueFilters.items()]
+        masks.append(self.searchMask(rowCount))
+        masks = [mask for mask in masks if mask is not None]
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
+
+    def filterMask(self):
+        # 노출된 원본 행 기준의 마스크. 거르지 않으면 None
+        rowCount = self.sourceModel().rowCount()
+        masks = [self._engine.mask(self.columnText, rowCount), self.valueMask(rowCount), self.searchMask(rowCount)]
+        masks = [mask for mask in masks if mask is not None]
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
+
+    def invalidateFilter(self):
+        # 새 매핑이 다를 때만 layoutChanged 한 번으로 바꾼다. 걸러진 행의 영구 인덱스는 무효가 된다
+        mask = self.filterMask()
+        rows = None if mask is None else np.flatnonzero(mask)
+        if rows is None and self._rows is None or \
+                rows is not None and self._rows is not None and np.array_equal(rows, self._rows):
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sourceRows = [self.sourceRow(index.row()) for index in persistent]
+        self._rows = rows
+        self.changePersistentIndexList(persistent, [self.index(self.proxyRow(row), index.column())
+                                                    for row, index in zip(sourceRows, persistent)])
+        self.layoutChanged.emit()
+
+    def isFiltering(self):
+        return self._job is not None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 프록시에서 행마다 비교하지 않고 원본 모델의 순열 정렬을 쓴다
+        self.sourceModel().sort(column, order)
+
+    def columnText(self, column, first=None, last=None):
+        model = self.sourceModel()
+        if first is not None:
+            if 0 <= column < model.columnCount():
+                return model.textRange(column, first, last)
+            return np.full(last - first + 1, '', dtype=object)
+        if 0 <= column < model.columnCount():
+            return model.columnText(column)
+        return np.full(model.rowCount(), '', dtype=object)
+
+    def on_job_finished(self, job):
+        if job is not self._job or job.generation != self._generation:
+            return
+        self._job = None
+        if job.revision != self._revision:
+            # 계산 도중 원본이 바뀌었으면 다시 계산
+            self.setFilterAsync(job.expresion, job.column)
+            return
+        self._engine.setColumnMask(job.expresion, job.column, job.mask)
+        self.invalidateFilter()
+        self.filterFinished.emit()
+
+    def flushChanges(self):
+        # 모아 둔 셀 범위를 열마다 한 번에 고유값 색인과 검색 색인에 반영한다
+        if not self._changed:
+            return
+        changed, self._changed = self._changed, []
+        model = self.sourceModel()
+        for column in sorted(set().union(*[columns for first, last, columns in changed])):
+            if column not in self._values and self._searchIndex is None:
+                continue
+            ranges = [(first, last) for first, last, columns in changed if column in columns]
+            rows = np.concatenate([np.arange(first, last + 1) for first, last in ranges])
+            rows, unique = np.unique(rows, return_index=True)
+            texts = np.concatenate([model.textRange(column, first, last) for first, last in ranges])[unique]
+            if column in self._values:
+                self._values[column].setCells(rows, texts)
+            if self._searchIndex is not None:
+                self._searchIndex.setCells(column, rows, texts)
+
+    def on_changeTimer_timeout(self):
+        self.flushChanges()
+        # 고친 값이 필터에 걸리거나 풀렸으면 매핑을 한 번에 바꾼다
+        if self._rows is not None:
+            self.invalidateFilter()
+
+    def on_source_dataChanged(self, topLeft, bottomRight, roles=[]):
+        self._revision += 1
+        columns = range(topLeft.column(), bottomRight.column() + 1)
+        self._engine.invalidate(columns, topLeft.row(), bottomRight.row())
+        if self._values or self._searchIndex is not None:
+            self._changed.append((topLeft.row(), bottomRight.row(), columns))
+        self._valueMask = None
+        self._searchMask = None
+        if self._changed or self._rows is not None:
+            self._changeTimer.start()
+        # 매핑은 나중에 바꾸고 지금은 보이는 행만 알린다
+        first, last = self.proxyRange(topLeft.row(), bottomRight.row())
+        if first <= last:
+            self.dataChanged.emit(self.index(first, topLeft.column()), self.index(last, bottomRight.column()), roles)
+
+    def on_source_headerDataChanged(self, orientation, first, last):
+        if orientation == Qt.Horizontal:
+            self.headerDataChanged.emit(orientation, first, last)
+        elif self.rowCount() > 0:
+            self.headerDataChanged.emit(orientation, 0, self.rowCount() - 1)
+
+    def on_source_rowsAboutToBeInserted(self, parent, first, last):
+        self.flushChanges()
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def on_source_rowsInserted(self, parent, first, last):
+        self._revision += 1
+        self._engine.insertRows(first, last)
+        model = self.sourceModel()
+        for column, values in self._values.items():
+            values.insertRows(first, model.textRange(column, first, last))
+        self._valueMask = None
+        # fetchMore 로 노출만 된 행은 이미 색인에 있다
+        if self._searchIndex is not None and self._searchIndex.rowCount() < model.totalRowCount():
+            self._searchIndex.insertRows(first, [model.textRange(column, first, last)
+                                                 for column in range(model.columnCount())])
+        self._searchMask = None
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        # 새 행 중 필터를 통과한 행만 보이는 자리에 끼워 넣는다
+        accepted = np.flatnonzero(self.filterMask()[first:last + 1]) + first
+        position = int(np.searchsorted(self._rows, first))
+        rows = np.concatenate([self._rows[:position], accepted, self._rows[position:] + (last - first + 1)])
+        if len(accepted):
+            self.beginInsertRows(QModelIndex(), position, position + len(accepted) - 1)
+        self._rows = rows
+        if len(accepted):
+            self.endInsertRows()
+
+    def on_source_rowsAboutToBeRemoved(self, parent, first, last):
+        self.flushChanges()
+        proxyFirst, proxyLast = self.proxyRange(first, last)
+        if proxyFirst <= proxyLast:
+            self.beginRemoveRows(QModelIndex(), proxyFirst, proxyLast)
+
+    def on_source_rowsRemoved(self, parent, first, last):
+        self._revision += 1
+        self._engine.removeRows(first, last)
+        for values in self._values.values():
+            values.removeRows(first, last)
+        self._valueMask = None
+        if self._searchIndex is not None:
+            self._searchIndex.removeRows(first, last)
+        self._searchMask = None
+        proxyFirst, proxyLast = self.proxyRange(first, last)
+        if self._rows is not None:
+            self._rows = np.concatenate([self._rows[:proxyFirst], self._rows[proxyLast + 1:] - (last - first + 1)])
+        if proxyFirst <= proxyLast:
+            self.endRemoveRows()
+
+    def on_source_rowsPermuted(self, order):
+        for column, values in list(self._values.items()):
+            if len(values.codes) == len(order):
+                values.permute(order)
+            else:
+                # 가상 모드에서는 노출된 행만 색인하므로 다음에 다시 만든다
+                del self._values[column]
+        if self._searchIndex is not None:
+            self._searchIndex.permute(order)
+        # 필터 마스크도 다시 계산하지 않고 새 순서로 옮긴다
+        self._engine.permute(order)
+        self._searchMask = None
+        self._valueMask = None
+
+    def on_source_rowsKept(self, keep):
+        # 흩어진 행을 한 번에 지웠다. 색인과 마스크에서 지운 행만 빼고, 매핑은 layoutChanged 에서 다시 만든다
+        for column, values in list(self._values.items()):
+            if len(values.codes) == len(keep):
+                values.keepRows(keep)
+            else:
+                del self._values[column]
+        if self._searchIndex is not None:
+            self._searchIndex.keepRows(keep)
+        self._engine.keepRows(keep)
+        # 검색과 값 필터의 결과도 다시 찾지 않고 남은 행만 고른다
+        if self._searchMask is not None and len(self._searchMask) == len(keep):
+            self._searchMask = self._searchMask[keep]
+        else:
+            self._searchMask = None
+        if self._valueMask is not None and len(self._valueMask) == len(keep):
+            self._valueMask = self._valueMask[keep]
+        else:
+            self._valueMask = None
+
+    def on_source_layoutAboutToBeChanged(self, *args):
+        # 정렬: 영구 인덱스를 원본 인덱스로 잡아 두었다가 새 매핑으로 옮긴다
+        self.flushChanges()
+        self.layoutAboutToBeChanged.emit()
+        self._layout = [(index, QPersistentModelIndex(self.mapToSource(index))) for index in self.persistentIndexList()]
+
+    def on_source_layoutChanged(self, *args):
+        self._revision += 1
+        mask = self.filterMask()
+        self._rows = None if mask is None else np.flatnonzero(mask)
+        layout, self._layout = self._layout or [], None
+        self.changePersistentIndexList([index for index, source in layout],
+                                       [self.index(self.proxyRow(source.row()), source.column())
+                                        for index, source in layout])
+        self.layoutChanged.emit()
+
+    def on_source_reset(self, *args):
+        self._revision += 1
+        self._engine.invalidate()
+        self._changed = []
+        self._searchMask = None
+        self._valueMask = None
+        mask = self.filterMask()
+        self._rows = None if mask is None else np.flatnonzero(mask)
+        self.endResetModel()
+
+
+class ReloadJobSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class ReloadJob(QRunnable):
+    # 바뀐 파일을 작업 스레드에서 읽고, 읽기 시작할 때의 모델 스냅샷(df)과 키로 맞춰 비교한다
+    def __init__(self, fileName, key, df, revision):
+        super().__init__()
+        self.fileName = fileName
+        self.key = key
+        self.df = df
+        self.revision = revision
+        self.new = None
+        self.diff = None
+        self.error = None
+        self.signals = ReloadJobSignals()
+
+    def run(self):
+        try:
+            self.new = CsvReader(self.fileName).read()
+            self.diff = diffFrames(self.df, self.new)
+        except Exception as e:
+            self.error = '%s: %s' % (type(e).__name__, e)
+        finally:
+            self.df = None
+            self.signals.finished.emit(self)
 
 
 class dCairosEditor(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, fileName=None, pool=None, workspace=None):
         super(dCairosEditor, self).__init__()
         self.setWindowTitle('dCairosEditor')
+        # 탭으로 열린 편집기들은 workspace 의 문자열 풀을 같이 쓴다
+        self.pool = pool if pool is not None else StringPool()
+        self.workspace = workspace
         self.center()
         self.tableView = QTableView()
+        self.editTriggers = self.tableView.editTriggers()
         self.label = QLabel()
         self.label.setText("Filter")
         self.lineEdit = QLineEdit()
         self.comboBox = QComboBox()
+        self.statusLabel = QLabel()
 
         self.gridLayout = QGridLayout()
         self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
         self.gridLayout.addWidget(self.lineEdit, 0, 1, 1, 1)
         self.gridLayout.addWidget(self.comboBox, 0, 2, 1, 1)
+        self.gridLayout.addWidget(self.statusLabel, 0, 3, 1, 1)
+
+        self.searchLabel = QLabel()
+        self.searchLabel.setText("Search")
+        self.searchEdit = QLineEdit()
+        self.checkKeywords = QCheckBox('Keywords')
+        self.gridLayout.addWidget(self.searchLabel, 1, 0, 1, 1)
+        self.gridLayout.addWidget(self.searchEdit, 1, 1, 1, 1)
+        self.gridLayout.addWidget(self.checkKeywords, 1, 2, 1, 1)
+        self.searchIndex = None
+        self.pendingSearch = False
+
+        # 입력이 멈춘 뒤에만 필터를 계산한다
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(250)
+        self.filterTimer.timeout.connect(self.on_filterTimer_timeout)
 
         self.tableView.clicked.connect(self.viewClicked)
         self.tableView.setStyleSheet("QTableView{gridline-color: black}")
 
         self.basedir = os.path.abspath(os.path.dirname(__file__))
-        self.fileName = os.path.join(self.basedir, 'csv', 'BaseLine', 'IIS.csv')
-        
-        self.header = pd.read_csv(self.fileName).loc[0].tolist()
-        df = pd.read_csv(self.fileName, header=1)
+        self.fileName = fileName or os.path.join(self.basedir, 'csv', 'BaseLine', 'IIS.csv')
 
-        self.model = PandasModel(df)
-        self.proxy = CustomProxyModel(self)
-        self.proxy.setSourceModel(self.model)
-        self.tableView.setModel(self.proxy)
-        self.tableView.resizeColumnsToContents()
+        # 첫 청크 뒤는 작업 스레드에서 읽고, 저장은 한 번에 하나씩 차례로 작업 스레드에서 쓴다
+        self.loadJob = None
+        self.loadProgress = None
+        self.saveJobs = []
+        self.savePool = workspace.savePool if workspace is not None else QThreadPool(self)
+        self.savePool.setMaxThreadCount(1)
+        self.message = ''
+        # 읽기를 취소했거나 실패해 파일의 앞부분만 들어 있다. 이 상태로 원래 파일에 덮어쓰면 나머지 행이 사라진다
+        self.partial = False
+        # 같은 파일에 저장할 때는 편집 저널에 'save' 만 덧붙여 바로 끝내고, 그 상태(savedFrame)를
+        # 작업 스레드에서 CSV 에 다시 쓴다. 쓰는 중에 또 저장하면 끝난 뒤에 한 번 더 쓴다 (compactPending)
+        self.changeLog = None
+        self.savedFrame = None
+        self.compactPending = False
+        # 열 때 남아 있던 저널. 다 읽은 뒤에 다시 적용하고, 그때까지는 고치지 못하게 한다
+        self.pendingChangeLog = None
+        # Watch 를 켜면 열린 파일이 바뀔 때 바뀐 행만 모델에 반영한다
+        self.reloadJob = None
+        self.loadedKey = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_watcher_fileChanged)
+        self.reloadTimer = QTimer(self)
+        self.reloadTimer.setSingleShot(True)
+        self.reloadTimer.setInterval(RELOADDELAY)
+        self.reloadTimer.timeout.connect(self.reloadFile)
 
-        self.comboBox.clear()
-        self.comboBox.addItems(["{0}".format(col) for col in self.model._data.columns])
         self.lineEdit.textChanged.connect(self.on_lineEdit_textChanged)
+        self.searchEdit.returnPressed.connect(self.on_searchEdit_returnPressed)
+        self.searchEdit.textChanged.connect(self.on_searchEdit_textChanged)
         self.comboBox.currentIndexChanged.connect(self.on_comboBox_currentIndexChanged)
 
-        self.tableView.resizeColumnsToContents()  # 컬럼 전체 자동 사이즈 조절
-        self.tableView.resizeRowsToContents()  # 행 전체 자동 사이즈 조절
-
         self.tableView.setAlternatingRowColors(True)
-        self.selectRow = self.model.rowCount(QModelIndex())
+        # 행 높이는 모두 같게 두고, 여러 줄인 셀이 있는 행만 화면에 보일 때 맞춘다
+        verticalHeader = self.tableView.verticalHeader()
+        verticalHeader.setSectionResizeMode(QHeaderView.Fixed)
+        verticalHeader.setDefaultSectionSize(self.tableView.fontMetrics().height() + 8)
+        self.sizeTimer = QTimer(self)
+        self.sizeTimer.setSingleShot(True)
+        self.sizeTimer.setInterval(50)
+        self.sizeTimer.timeout.connect(self.resizeVisibleRows)
+        self.tableView.verticalScrollBar().valueChanged.connect(self.on_verticalScrollBar_valueChanged)
+        # 헤더를 누르면 정렬과 값 필터 메뉴를 띄운다
+        self.horizontalHeader = self.tableView.horizontalHeader()
+        self.horizontalHeader.setSortIndicator(-1, Qt.AscendingOrder)
+        self.horizontalHeader.setSortIndicatorShown(True)
+        self.horizontalHeader.setSectionsClickable(True)
+        self.horizontalHeader.sectionClicked.connect(self.on_view_horizontalHeader_sectionClicked)
 
-        self.filters = "CSV files (*.csv)"
+        # 이보다 큰 파일은 fetchMore 로 행을 나눠 보여주는 가상 모드로 연다
+        self.virtualThreshold = 64 * 1024 * 1024
 
-        self.fileName = None
+        self.filters = "CSV files (*.csv)"
 
         self.buttonOpen = QPushButton('Open', self)
         self.buttonSave = QPushButton('Save', self)
         self.buttonAdd = QPushButton('add', self)
         self.buttonDel = QPushButton('Del', self)
+        self.buttonCheck = QPushButton('Check', self)
+        self.buttonCancel = QPushButton('Cancel', self)
+        self.buttonCancel.setEnabled(False)
+        self.checkVisible = QCheckBox('Visible rows only', self)
+        # 켜면 data, filterMask 등의 호출 수와 시간을 상태 표시줄에 보여주고 추적 파일로 내보낸다
+        self.checkWatch = QCheckBox('Watch', self)
+        self.checkProfile = QCheckBox('Profile', self)
+        self.buttonTrace = QPushButton('Trace', self)
+        self.profileTimer = QTimer(self)
+        self.profileTimer.setInterval(500)
+        self.profileTimer.timeout.connect(self.updateStatus)
 
         self.group = QButtonGroup()
         self.group.addButton(self.buttonOpen)
         self.group.addButton(self.buttonSave)
         self.group.addButton(self.buttonAdd)
         self.group.addButton(self.buttonDel)
+        self.group.addButton(self.buttonCheck)
+        self.group.addButton(self.buttonCancel)
 
         self.buttonOpen.clicked.connect(self.handleOpen)
         self.buttonSave.clicked.connect(self.handleSave)
         self.buttonAdd.clicked.connect(self.insertRows)
         self.buttonDel.clicked.connect(self.removeRows)
+        self.buttonCheck.clicked.connect(self.handleCheck)
+        self.buttonCancel.clicked.connect(self.cancelJobs)
+        self.buttonTrace.clicked.connect(self.on_buttonTrace_clicked)
+        self.checkProfile.toggled.connect(self.on_checkProfile_toggled)
+        self.checkWatch.toggled.connect(self.on_checkWatch_toggled)
 
         layout = QHBoxLayout()
         layout.addWidget(self.buttonOpen)
         layout.addWidget(self.buttonSave)
         layout.addWidget(self.buttonAdd)
         layout.addWidget(self.buttonDel)
+        layout.addWidget(self.buttonCheck)
+        layout.addWidget(self.buttonCancel)
+        layout.addWidget(self.checkVisible)
+        layout.addWidget(self.checkWatch)
+        layout.addWidget(self.checkProfile)
+        layout.addWidget(self.buttonTrace)
 
         Vlayout = QVBoxLayout()
         Vlayout.addLayout(self.gridLayout)
@@ -110,74 +805,551 @@ class dCairosEditor(QWidget):
         
         self.setLayout(Vlayout)
 
+        self.loadFile(self.fileName)
+        self.fileName = None
+        self.checkProfile.setChecked(profiler.enabled)
+        self.buttonTrace.setEnabled(profiler.enabled)
+
 ################################################################################
     def handleSave(self):
         if self.fileName == None or self.fileName == '':
             self.fileName, self.filters = QFileDialog.getSaveFileName(self, filter=self.filters)
         if(self.fileName != ''):
-            labels = []
-            labels.append(self.header)
-            for row in range(self.model.rowCount(QModelIndex())):
-                rowdata = []
-                for column in range(self.model.columnCount(QModelIndex())):
-                    item = self.model.index(row, column, QModelIndex()).data(Qt.DisplayRole)
-                    if item is not None:
-                       rowdata.append(item)
-                    else:
-                       rowdata.append('')
-                labels.append(rowdata)
-            df = pd.DataFrame(labels)
-            df.to_csv(self.fileName, mode='w', index=False)
+            visibleOnly = self.checkVisible.isChecked() and self.proxy.acceptedRows() is not None
+            sameFile = os.path.abspath(self.fileName) == os.path.abspath(self.openedFile)
+            if self.partial and sameFile and not self.confirmPartialSave():
+                self.message = "Not saved: %s is only partly loaded" % os.path.basename(self.openedFile)
+                self.updateStatus()
+                return False
+            if self.changeLog is not None and not visibleOnly and sameFile:
+                # 정렬만 바꾼 순서는 저장할 때 저널에 남긴다. 실패하면 저널을 버리고 아래에서 전체 저장한다
+                self.model.recordOrder()
+            if self.changeLog is not None and not visibleOnly and sameFile:
+                try:
+                    self.changeLog.save()
+                except OSError as e:
+                    # 저널에 쓰지 못하면 저널을 버리고 아래에서 전체 저장한다
+                    self.on_model_journalFailed(str(e))
+                else:
+                    self.savedRevision = self.model.revision
+                    self.savedEdits = self.model.edits
+                    self.savedFrame = self.model.frame().copy(deep=False)
+                    self.message = "Saved %d changes" % len(self.changeLog.lines)
+                    self.compactChanges()
+                    self.updateStatus()
+                    return True
+
+            df = self.model.frame().copy(deep=False)
+            revision = self.model.revision
+            if visibleOnly:
+                df = df[self.proxy.acceptedRows()]
+                revision = None
+            job = self.queueSave(self.fileName, df, revision)
+            if visibleOnly and sameFile:
+                # 보이는 행만 원래 파일에 쓰면 저널의 편집은 새 파일에 다시 적용할 수 없다.
+                # 먼저 저장한 반영분은 앞서 쓰고, 밀린 반영분은 버리고, 다 쓰면 저널을 지운다
+                self.compactPending = False
+                job.replaces = self.changeLog
 
             return True
         else:
             return False
 
+    def confirmPartialSave(self):
+        answer = QMessageBox.question(
+            self, 'dCairosEditor',
+            "Only %d rows of %s were loaded. Overwrite the file with these rows?" % (
+                self.model.totalRowCount(), os.path.basename(self.openedFile)),
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
+
+    def queueSave(self, fileName, df, revision, compaction=False):
+        job = SaveJob(fileName, self.header, df, self.model, revision)
+        job.compaction = compaction
+        job.replaces = None
+        if compaction:
+            # 마지막 'save' 줄까지의 상태를 쓰므로 끝나면 저널에서 그 줄들만 덜어낸다
+            job.changeLog = self.changeLog
+            job.changes = self.changeLog.saved
+            job.edits = self.savedEdits
+        else:
+            # 전체를 저장하면 그때까지의 저널 줄 수를 기억해 두었다가 끝나면 저널에서 덜어낸다
+            job.changeLog = self.changeLog if revision is not None else None
+            job.changes = len(self.changeLog.lines) if job.changeLog is not None else 0
+            job.edits = self.model.edits
+        job.signals.progress.connect(self.on_saveJob_progress)
+        job.signals.finished.connect(self.on_saveJob_finished)
+        self.saveJobs.append(job)
+        self.savePool.start(job)
+        self.updateStatus()
+        return job
+
+    def compactChanges(self):
+        # 마지막으로 저장한 상태를 작업 스레드에서 CSV 로 다시 쓴다. 그 뒤에 고친 내용은 저널에 남는다
+        if self.changeLog is None or not self.changeLog.saved or self.savedFrame is None:
+            return False
+        if any(job.compaction for job in self.saveJobs):
+            self.compactPending = True
+            return False
+        self.compactPending = False
+        self.queueSave(self.openedFile, self.savedFrame, self.savedRevision, compaction=True)
+        return True
+
+    def replayChanges(self, changeLog):
+        for number, change in enumerate(changeLog.changes(), 1):
+            self.model.applyChange(change)
+            if number == changeLog.saved:
+                self.savedRevision = self.model.revision
+                self.savedEdits = self.model.edits
+                self.savedFrame = self.model.frame().copy(deep=False)
+        if self.model.sortKeys:
+            column, ascending = self.model.sortKeys[0]
+            self.horizontalHeader.setSortIndicator(column, Qt.AscendingOrder if ascending else Qt.DescendingOrder)
+        self.changeLog = self.model.changeLog = changeLog
+        if changeLog.unsaved():
+            self.message = "Recovered %d unsaved changes" % changeLog.unsaved()
+        self.compactChanges()
+
+    @QtCore.pyqtSlot(str)
+    def on_model_journalFailed(self, error):
+        # 저널에 더 쓸 수 없으면 버리고, 이후 저장은 CSV 전체를 다시 쓴다. 저장한 편집까지만 남겨 CSV 에 반영한다
+        if self.changeLog is not None:
+            try:
+                self.changeLog.discardUnsaved()
+            except OSError:
+                self.changeLog.close()
+            self.compactChanges()
+        self.changeLog = self.model.changeLog = None
+        self.compactPending = False
+        self.message = "Journal failed, saving whole files: %s" % error
+        self.updateStatus()
+
+    def dropChangeLog(self):
+        # 파일이 저널의 기준과 달라졌다. 이후 저장은 CSV 전체를 다시 쓴다
+        changeLog, self.changeLog = self.changeLog, None
+        self.model.changeLog = None
+        self.savedFrame = None
+        self.compactPending = False
+        for job in self.saveJobs:
+            if job.changeLog is changeLog:
+                job.changeLog = None
+        try:
+            changeLog.remove()
+        except OSError:
+            pass
+
+    def closeChangeLog(self):
+        # 저장한 편집은 CSV 에 반영한 뒤 저널을 지우고, 저장하지 않은 편집은 버린다.
+        # 이 저널을 덜어낼 저장은 끝날 때까지 기다리고, 아직 반영하지 않은 저장분은 여기서 바로 쓴다
+        self.pendingChangeLog = None
+        self.compactPending = False
+        if self.changeLog is None:
+            return
+        for job in [job for job in self.saveJobs if job.changeLog is self.changeLog]:
+            job.done.wait()
+            self.on_saveJob_finished(job)
+        changeLog, self.changeLog = self.changeLog, None
+        self.model.changeLog = None
+        if changeLog.saved and self.savedFrame is not None:
+            try:
+                writeCsv(self.openedFile, self.header, self.savedFrame)
+                changeLog.rebase(self.openedFile, changeLog.saved)
+            except OSError as e:
+                # 쓰지 못하면 저장한 편집은 저널에 남겨 다음에 열 때 다시 적용한다
+                self.message = "Save failed: %s" % e
+        self.savedFrame = None
+        changeLog.discardUnsaved()
+        changeLog.close()
+
 ################################################################################
     def handleOpen(self):
+        if self.workspace is not None:
+            # 작업 공간에서는 고른 파일마다 새 탭으로 연다
+            fileNames, self.filterName = QFileDialog.getOpenFileNames(self, filter=self.filters)
+            for fileName in fileNames:
+                self.workspace.openFile(fileName)
+            return bool(fileNames)
+
         self.fileName, self.filterName = QFileDialog.getOpenFileName(self)
 
         if self.fileName != '':
-            self.header = pd.read_csv(self.fileName).loc[0].tolist()
-            df = pd.read_csv(self.fileName, header=1)
-            self.model = None
-            self.model = PandasModel(df)
-            self.proxy = CustomProxyModel(self)
-            self.proxy.setSourceModel(self.model)
-            self.tableView.setModel(self.proxy)
-
-            self.tableView.resizeColumnsToContents()  # 컬럼 전체 자동 사이즈 조절
-            self.tableView.resizeRowsToContents()  # 행 전체 자동 사이즈 조절
+            self.loadFile(self.fileName)
             self.fileName = ''
-            self.lineEdit.clear()
-            self.comboBox.clear()
-            self.comboBox.addItems(["{0}".format(col) for col in self.model._data.columns])
-            
+
             return True
         else:
             return False
 
 ################################################################################
-    def insertRows(self, position, rows=1, index=QModelIndex()):
+    def loadFile(self, fileName):
+        self.cancelLoad()
+        if hasattr(self, 'model'):
+            self.closeChangeLog()
+        self.openedFile = fileName
+        self.partial = False
+        self.searchIndex = None
+        self.savedRevision = 0
+        self.savedEdits = 0
+        self.reloadJob = None
+        self.loadedKey = fileKey(fileName)
+        self.watch()
+        reader = CsvReader(fileName)
+        chunks = reader.chunks()
+        df = next(chunks, None)
+        self.header = reader.header
+        if df is None:
+            df = pd.DataFrame(columns=reader.columns)
+        # 반복되는 값이 많은 문자열 열(중요도, 연산자, 권고사항 등)은 범주형으로 바꾼다
+        self.categoryColumns = self.pool.categoryColumns(df)
+        df = self.pool.categorize(df, self.categoryColumns)
+
+        virtual = os.path.getsize(fileName) > self.virtualThreshold
+        self.model = PandasModel(df, copy=False, virtual=virtual)
+        self.model.journalFailed.connect(self.on_model_journalFailed)
+        self.proxy = CustomProxyModel(self)
+        self.proxy.filterStarted.connect(self.on_proxy_filterStarted)
+        self.proxy.filterFinished.connect(self.on_proxy_filterFinished)
+        self.proxy.setSourceModel(self.model)
+        self.horizontalHeader.setSortIndicator(-1, Qt.AscendingOrder)
+        self.tableView.setModel(self.proxy)
+
+        self.resizeColumns()  # 컬럼 자동 사이즈 조절 (표본 행만 잰다)
+        self.sizeTimer.start()
         self.selectRow = self.model.rowCount(QModelIndex())
-        self.model.beginInsertRows(QModelIndex(), position, position + rows - 1)
-        self.model._data.loc[self.selectRow] = 'NoData'
-        self.model.endInsertRows()
+        self.lineEdit.clear()
+        self.searchEdit.clear()
+        self.comboBox.clear()
+        self.comboBox.addItems(["{0}".format(col) for col in self.model._data.columns])
 
-        return True
+        self.message = ''
+        changeLog = ChangeLog.load(fileName)
+        if changeLog is not None and changeLog.isEmpty():
+            changeLog.remove()
+            changeLog = None
+        # 저널이 남아 있으면 (CSV 에 반영하기 전에 끝났거나 비정상 종료) 다 읽은 뒤에 다시 적용한다
+        self.pendingChangeLog = changeLog
+        self.setEditable(changeLog is None)
+        self.loadProgress = (reader.bytesRead, reader.size, len(df.index))
+        self.loadJob = LoadJob(reader, chunks, self.pool, self.categoryColumns, len(df.index))
+        self.loadJob.signals.chunk.connect(self.on_loadJob_chunk)
+        self.loadJob.signals.progress.connect(self.on_loadJob_progress)
+        self.loadJob.signals.finished.connect(self.on_loadJob_finished)
+        QThreadPool.globalInstance().start(self.loadJob)
+        self.updateStatus()
+
+    def cancelLoad(self):
+        if self.loadJob is not None:
+            # 작업 스레드가 다음 청크에서 멈추고 파일을 닫는다. 그 사이에 도착한 청크는 버린다
+            self.loadJob.cancel()
+            self.partial = True
+        self.loadJob = None
+        if self.pendingChangeLog is not None:
+            # 앞부분만 읽은 모델에는 저널을 적용하지 않는다. 저널은 그대로 두어 다음에 열 때 적용한다
+            self.pendingChangeLog = None
+            self.message = "Journal not applied"
+            self.setEditable(True)
+        if hasattr(self, 'proxy'):
+            self.updateStatus()
+
+    def cancelJobs(self):
+        self.cancelLoad()
+        for job in self.saveJobs:
+            job.cancel()
+        self.updateStatus()
+
+    @QtCore.pyqtSlot(object, object)
+    def on_loadJob_chunk(self, job, df):
+        if job is self.loadJob:
+            self.model.appendFrame(df)
+
+    @QtCore.pyqtSlot(object, 'qlonglong', 'qlonglong')
+    def on_loadJob_progress(self, job, bytesRead, rows):
+        if job is self.loadJob:
+            self.loadProgress = (bytesRead, job.reader.size, rows)
+            self.updateStatus()
+
+    @QtCore.pyqtSlot(object)
+    def on_loadJob_finished(self, job):
+        if job is not self.loadJob:
+            return
+        self.loadJob = None
+        changeLog, self.pendingChangeLog = self.pendingChangeLog, None
+        self.setEditable(True)
+        if job.error is not None:
+            self.message = "Load stopped: %s" % job.error
+            self.partial = True
+        elif changeLog is not None:
+            self.replayChanges(changeLog)
+        elif self.model.revision == 0:
+            # 다 읽기 전에 고친 내용은 저널로 다시 만들 수 없으므로 그때는 전체 저장만 쓴다
+            self.changeLog = self.model.changeLog = ChangeLog(self.openedFile)
+        if self.pendingSearch:
+            self.runSearch()
+        self.updateStatus()
+
+    @QtCore.pyqtSlot(object, 'qlonglong', 'qlonglong')
+    def on_saveJob_progress(self, job, bytesWritten, rows):
+        self.updateStatus()
+
+    @QtCore.pyqtSlot(object)
+    def on_saveJob_finished(self, job):
+        if job not in self.saveJobs:
+            # 닫을 때 closeChangeLog 가 기다려서 이미 처리했다
+            return
+        self.saveJobs.remove(job)
+        if job.error is not None:
+            self.message = "Save failed: %s" % job.error
+        elif job.cancelled:
+            self.message = "Save cancelled: %s" % os.path.basename(job.fileName)
+        else:
+            if not job.compaction:
+                self.message = "Saved %s" % os.path.basename(job.fileName)
+            if job.changeLog is not None and (job.changeLog is self.changeLog or
+                                              os.path.abspath(job.fileName) == os.path.abspath(job.changeLog.fileName)):
+                try:
+                    job.changeLog.rebase(job.fileName, job.changes)
+                except OSError as e:
+                    self.message = "Journal failed: %s" % e
+                if job.changeLog is self.changeLog and not self.changeLog.saved:
+                    self.savedFrame = None
+            if job.replaces is not None and job.replaces is self.changeLog:
+                self.dropChangeLog()
+            if job.revision is not None and job.source is self.model:
+                self.openedFile = job.fileName
+                self.partial = False
+                if not job.compaction:
+                    self.savedRevision = job.revision
+                    self.savedEdits = job.edits
+                # 직접 저장한 내용은 다시 읽지 않는다
+                self.loadedKey = fileKey(job.fileName)
+                self.watch()
+                if self.searchIndex is not None and self.model.revision == job.revision:
+                    try:
+                        self.searchIndex.save(job.fileName)
+                    except OSError:
+                        pass
+        if self.compactPending:
+            self.compactChanges()
+        self.updateStatus()
+
+    def setEditable(self, editable):
+        self.tableView.setEditTriggers(self.editTriggers if editable else QAbstractItemView.NoEditTriggers)
+        for button in (self.buttonSave, self.buttonAdd, self.buttonDel, self.buttonCheck):
+            button.setEnabled(editable)
+
+    def resizeColumns(self):
+        metrics = self.tableView.fontMetrics()
+        count = min(self.model.rowCount(QModelIndex()), SIZEROWS)
+        for column in range(self.model.columnCount()):
+            texts = [str(self.model.headerData(column, Qt.Horizontal))]
+            if count > 0:
+                values = self.model.textRange(column, 0, count - 1)
+                # 한글 등 ASCII 가 아닌 글자는 두 칸으로 세어 가장 넓을 법한 문자열을 고른다
+                series = pd.Series(values, dtype=object)
+                lengths = (series.str.len() + series.str.count(r'[^\x00-\x7f]')).to_numpy()
+                longest = np.argsort(lengths)[-SIZELONGEST:]
+                texts += list(values[:SIZESAMPLE]) + list(values[longest])
+            width = max(metrics.horizontalAdvance(text) for text in texts) + 24
+            self.horizontalHeader.resizeSection(column, min(width, MAXCOLUMNWIDTH))
+
+    def resizeVisibleRows(self):
+        # 여러 줄인 셀이 있는 행만, 그리고 화면에 보이는 행만 높이를 맞춘다
+        top = self.tableView.rowAt(0)
+        if top < 0:
+            return
+        bottom = self.tableView.rowAt(self.tableView.viewport().height() - 1)
+        if bottom < 0:
+            bottom = self.proxy.rowCount() - 1
+        for row in range(top, bottom + 1):
+            if any('\n' in str(self.proxy.index(row, column).data())
+                   for column in range(self.proxy.columnCount())):
+                self.tableView.resizeRowToContents(row)
+
+    @QtCore.pyqtSlot(int)
+    def on_verticalScrollBar_valueChanged(self, value):
+        self.sizeTimer.start()
 
 ################################################################################
-    def removeRows(self, position, rows=1, index=QModelIndex()):
-        self.selectRow = self.model.rowCount(QModelIndex())
-        self.model.beginRemoveRows(QModelIndex(), position, position + rows - 1)
-        if self.selectRow-1 >= 0:
-            self.model._data.drop([self.selectRow-1], inplace=True)
-            self.model._data.reset_index(drop=True, inplace=True)
-            self.model.endRemoveRows()
+    @QtCore.pyqtSlot(bool)
+    def on_checkProfile_toggled(self, checked):
+        # 그리기 횟수는 켜져 있는 동안에만 viewport 이벤트를 엿봐서 센다
+        if checked and not profiler.enabled:
+            profiler.reset()
+        profiler.setEnabled(checked)
+        viewport = self.tableView.viewport()
+        if checked:
+            viewport.installEventFilter(self)
+            self.profileTimer.start()
+        else:
+            viewport.removeEventFilter(self)
+            self.profileTimer.stop()
+        self.buttonTrace.setEnabled(checked)
+        if self.workspace is not None:
+            self.workspace.setProfiling(checked)
+        self.updateStatus()
 
-            return True
+    @QtCore.pyqtSlot(bool)
+    def on_checkWatch_toggled(self, checked):
+        self.watch()
+        if checked:
+            self.reloadTimer.start()
+
+    def watch(self):
+        paths = self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        if self.checkWatch.isChecked() and os.path.exists(self.openedFile):
+            self.watcher.addPath(self.openedFile)
+
+    @QtCore.pyqtSlot(str)
+    def on_watcher_fileChanged(self, path):
+        # 새 파일로 바꿔치기(os.replace)하면 감시가 풀리므로 다시 건다
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)
+        self.reloadTimer.start()
+
+    def reloadFile(self):
+        if not self.checkWatch.isChecked():
+            return False
+        if self.loadJob is not None or self.reloadJob is not None or self.saveJobs:
+            self.reloadTimer.start()
+            return False
+        try:
+            key = fileKey(self.openedFile)
+        except OSError:
+            return False
+        if key == self.loadedKey:
+            return False
+        # 정렬만 바꾼 것은 괜찮지만, 고친 내용이나 CSV 에 아직 반영하지 않은 저장분이 있으면 다시 읽지 않는다
+        if self.model.edits != self.savedEdits or (self.changeLog is not None and self.changeLog.saved):
+            self.message = "%s changed on disk, not reloaded (unsaved edits)" % os.path.basename(self.openedFile)
+            self.updateStatus()
+            return False
+        self.reloadJob = ReloadJob(self.openedFile, key, self.model.frame().copy(deep=False), self.model.revision)
+        self.reloadJob.signals.finished.connect(self.on_reloadJob_finished)
+        QThreadPool.globalInstance().start(self.reloadJob)
+        return True
+
+    @QtCore.pyqtSlot(object)
+    def on_reloadJob_finished(self, job):
+        if job is not self.reloadJob:
+            return
+        self.reloadJob = None
+        if job.error is not None:
+            self.message = "Reload failed: %s" % job.error
+        elif job.revision != self.model.revision:
+            # 읽는 동안 고쳤으면 다시 판단한다
+            self.reloadTimer.start()
+        elif job.diff is None:
+            # 열이 바뀌었으면 처음부터 다시 연다
+            self.loadFile(self.openedFile)
+            return
         else:
+            self.applyReload(job.new, job.diff)
+            self.loadedKey = job.key
+        self.updateStatus()
+
+    def applyReload(self, new, diff):
+        # 모델을 다시 만들지 않고 바뀐 행만 반영해 필터, 정렬, 스크롤 위치를 그대로 둔다.
+        # 저널에는 남기지 않고, 반영한 뒤의 내용을 저장된 상태로 본다
+        model = self.model
+        # 고친 내용이 없을 때만 다시 읽으므로 저널에는 저장하지 않은 줄이 없다
+        model.changeLog = None
+        model.setRows(diff.changed, new.iloc[diff.changedNew], diff.columns)
+        if len(diff.removed):
+            model.fetchTo(int(diff.removed[-1]))
+            model.removeRowSet(diff.removed)
+        if len(diff.added):
+            model.appendFrame(self.pool.categorize(new.iloc[diff.added].reset_index(drop=True), self.categoryColumns))
+        # 먼저 새 파일의 행 순서로 맞춘 것을 저장된 상태로 보고, 정렬해 두었으면 다시 정렬한다
+        fileRows = np.concatenate([diff.newRows[diff.newRows >= 0], diff.added])
+        if np.any(np.diff(fileRows) < 0):
+            model.setOrder(model._rows[np.argsort(fileRows, kind='stable')])
+        self.savedRevision = model.revision
+        self.savedEdits = model.edits
+        # 새 파일과 같아졌으므로 앞부분만 읽은 상태도 풀린다
+        self.partial = False
+        model.changeLog = self.changeLog
+        if model.sortKeys:
+            model.sortBy(model.sortKeys)
+        self.message = "Reloaded %s: %d changed, %d added, %d removed" % (
+            os.path.basename(self.openedFile), len(diff.changed), len(diff.added), len(diff.removed))
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            profiler.frame()
+        return False
+
+    @QtCore.pyqtSlot()
+    def on_buttonTrace_clicked(self):
+        fileName, _ = QFileDialog.getSaveFileName(self, filter="Trace files (*.json)")
+        if fileName == '':
             return False
+        try:
+            self.message = "Trace: %d events" % profiler.exportTrace(fileName)
+        except OSError as e:
+            self.message = "Trace failed: %s" % e
+        self.updateStatus()
+        return True
+
+################################################################################
+    def handleCheck(self):
+        # 같은 이름의 BaseLine 규칙으로 점검결과 열을 채운다. 열이 모자라면 점검하기 전에 알린다
+        missing = missingColumns(self.model._data, REPORT_COLUMNS)
+        if missing:
+            self.warnCheck("%s is missing columns: %s" % (os.path.basename(self.openedFile), ', '.join(missing)))
+            return False
+        baseline = os.path.join(self.basedir, 'csv', 'BaseLine', os.path.basename(self.openedFile))
+        if not os.path.exists(baseline):
+            baseline, _ = QFileDialog.getOpenFileName(self, filter=self.filters)
+            if baseline == '':
+                return False
+        try:
+            rules = CsvReader(baseline).read()
+        except (OSError, ValueError) as e:
+            self.warnCheck("Cannot read %s: %s" % (os.path.basename(baseline), e))
+            return False
+        missing = missingColumns(rules, BASELINE_COLUMNS)
+        if missing:
+            self.warnCheck("%s is not a BaseLine file, missing columns: %s" % (os.path.basename(baseline),
+                                                                         ', '.join(missing)))
+            return False
+        frame = self.model.frame()
+        column, filled = applyCompliance(frame, rules)
+        self.model.setColumn(frame.columns.get_loc(REPORT_RESULT), column)
+        self.message = "Checked %d rows" % filled.sum()
+        self.updateStatus()
+        return True
+
+    def warnCheck(self, text):
+        self.message = "Check failed"
+        self.updateStatus()
+        QMessageBox.warning(self, 'dCairosEditor', text)
+
+################################################################################
+    def insertRows(self, position, rows=1, index=QModelIndex()):
+        # 선택한 행 수만큼 첫 선택 행 앞에 넣고, 선택이 없으면 끝에 한 행을 붙인다
+        selected = self.selectedSourceRows()
+        if len(selected):
+            return self.model.insertRows(int(selected[0]), len(selected))
+        return self.model.insertRows(self.model.rowCount(QModelIndex()), rows)
+
+################################################################################
+    def removeRows(self, position, rows=1, index=QModelIndex()):
+        # 선택한 행을 한 번에 지운다. 선택이 없으면 마지막 행
+        selected = self.selectedSourceRows()
+        if not len(selected):
+            last = self.model.rowCount(QModelIndex()) - 1
+            return last >= 0 and self.model.removeRows(last, 1)
+        self.tableView.clearSelection()
+        return self.model.removeRowSet(selected)
+
+    def selectedSourceRows(self):
+        selection = self.proxy.mapSelectionToSource(self.tableView.selectionModel().selection())
+        ranges = [np.arange(part.top(), part.bottom() + 1) for part in selection]
+        if not ranges:
+            return np.empty(0, dtype=int)
+        return np.unique(np.concatenate(ranges))
 
 ################################################################################
     def viewClicked(self, indexClicked):
@@ -192,27 +1364,223 @@ class dCairosEditor(QWidget):
         qr.moveCenter(cp)
         self.move(qr.topLeft())
 ###############################################################################
+    @QtCore.pyqtSlot(int)
+    def on_view_horizontalHeader_sectionClicked(self, logicalIndex):
+        self.logicalIndex = logicalIndex
+        self.menuValues = QMenu(self)
+        self.signalMapper = QSignalMapper(self.menuValues)
+
+        actionAscending = QAction("Sort ascending", self.menuValues)
+        actionAscending.triggered.connect(lambda: self.sortColumn(Qt.AscendingOrder))
+        actionDescending = QAction("Sort descending", self.menuValues)
+        actionDescending.triggered.connect(lambda: self.sortColumn(Qt.DescendingOrder))
+        self.menuValues.addAction(actionAscending)
+        self.menuValues.addAction(actionDescending)
+        self.menuValues.addSeparator()
+
+        actionAll = QAction("All", self.menuValues)
+        actionAll.triggered.connect(self.on_actionAll_triggered)
+        self.menuValues.addAction(actionAll)
+        self.menuValues.addSeparator()
+        self.menuItems, counts = self.proxy.columnValues(self.logicalIndex).items()
+        if len(self.menuItems) <= MENUSIZE:
+            for actionNumber, (value, count) in enumerate(zip(self.menuItems, counts)):
+                action = QAction('%s (%d)' % (value, count), self.menuValues)
+                self.signalMapper.setMapping(action, actionNumber)
+                action.triggered.connect(self.signalMapper.map)
+                self.menuValues.addAction(action)
+            self.signalMapper.mapped[int].connect(self.on_signalMapper_mapped)
+        else:
+            self.menuValues.addAction(self.valueListAction(self.menuItems, counts))
+        headerPos = self.tableView.mapToGlobal(self.horizontalHeader.pos())
+        posY = headerPos.y() + self.horizontalHeader.height()
+        posX = headerPos.x() + self.horizontalHeader.sectionViewportPosition(self.logicalIndex)
+
+        self.menuValues.exec_(QPoint(posX, posY))
+        self.menuValues.deleteLater()
+
+    def valueListAction(self, values, counts):
+        widget = QWidget(self.menuValues)
+        search = QLineEdit(widget)
+        search.setPlaceholderText("Search %d values" % len(values))
+        view = QListView(widget)
+        self.valueList = ValueListModel(values, counts, view)
+        view.setModel(self.valueList)
+        view.setUniformItemSizes(True)
+        search.textChanged.connect(self.valueList.setSearch)
+        view.clicked.connect(self.on_valueList_clicked)
+        layout = QVBoxLayout(widget)
+        layout.addWidget(search)
+        layout.addWidget(view)
+        action = QWidgetAction(self.menuValues)
+        action.setDefaultWidget(widget)
+        return action
+
+    @QtCore.pyqtSlot(QModelIndex)
+    def on_valueList_clicked(self, index):
+        value, count = self.valueList.item(index.row())
+        self.menuValues.close()
+        self.setValueFilter(self.logicalIndex, value)
+
+    @QtCore.pyqtSlot()
+    def on_actionAll_triggered(self):
+        self.setValueFilter(self.logicalIndex, None)
+
     @QtCore.pyqtSlot(int)
     def on_signalMapper_mapped(self, i):
-        stringAction = self.signalMapper.mapping(i).text()
-        filterColumn = self.logicalIndex
-        self.proxy.setFilter(stringAction, filterColumn)
+        self.setValueFilter(self.logicalIndex, self.menuItems[i])
+
+    def setValueFilter(self, filterColumn, value):
+        self.proxy.setValueFilter(filterColumn, None if value is None else [value])
         font = QFont()
-        font.setBold(True)
+        font.setBold(value is not None)
         self.model.setFont(filterColumn, font)
 
+    def sortColumn(self, order):
+        if self.pendingChangeLog is not None:
+            # 저널은 파일 순서를 기준으로 다시 적용한다
+            return
+        self.horizontalHeader.setSortIndicator(self.logicalIndex, order)
+        self.proxy.sort(self.logicalIndex, order)
+
     @QtCore.pyqtSlot(str)
     def on_lineEdit_textChanged(self, text):
-        self.proxy.setFilter(text, self.proxy.filterKeyColumn())
+        self.filterTimer.start()
+
+    @QtCore.pyqtSlot()
+    def on_filterTimer_timeout(self):
+        self.proxy.setFilterAsync(self.lineEdit.text(), self.proxy.filterKeyColumn())
+
+    @QtCore.pyqtSlot()
+    def on_proxy_filterStarted(self):
+        self.updateStatus()
+
+    @QtCore.pyqtSlot()
+    def on_proxy_filterFinished(self):
+        self.updateStatus()
+
+    def updateStatus(self):
+        self.buttonCancel.setEnabled(self.loadJob is not None or bool(self.saveJobs))
+        if self.loadJob is not None:
+            bytesRead, size, rows = self.loadProgress
+            self.statusLabel.setText("Loading... %d%% %d rows" % (100 * bytesRead // max(1, size), rows))
+        elif self.saveJobs:
+            job = self.saveJobs[0]
+            queued = " (+%d queued)" % (len(self.saveJobs) - 1) if len(self.saveJobs) > 1 else ""
+            self.statusLabel.setText("Saving %s... %d/%d rows%s" % (os.path.basename(job.fileName),
+                                                                    job.written, job.rows, queued))
+        elif self.proxy.isFiltering():
+            self.statusLabel.setText("Filtering...")
+        elif self.checkProfile.isChecked():
+            self.statusLabel.setText(profiler.summaryText())
+        elif self.partial:
+            self.statusLabel.setText("Partial: %d rows loaded%s" % (self.model.totalRowCount(),
+                                                                   ", " + self.message if self.message else ""))
+        else:
+            self.statusLabel.setText(self.message)
+
+    @QtCore.pyqtSlot()
+    def on_searchEdit_returnPressed(self):
+        if self.loadJob is not None:
+            # 색인은 파일을 다 읽은 뒤에 만든다
+            self.pendingSearch = True
+            return
+        self.runSearch()
+
+    @QtCore.pyqtSlot(str)
+    def on_searchEdit_textChanged(self, text):
+        if text == '':
+            self.pendingSearch = False
+            self.proxy.setSearch(self.searchIndex, '')
+
+    def runSearch(self):
+        self.pendingSearch = False
+        text = self.searchEdit.text()
+        if text and self.searchIndex is None:
+            self.searchIndex = self.buildSearchIndex()
+        self.proxy.setSearch(self.searchIndex, text, self.checkKeywords.isChecked())
+
+    def buildSearchIndex(self):
+        # 파일과 내용이 같으면 저장해 둔 색인을 쓰고, 새로 만든 색인은 다음 실행을 위해 저장한다
+        unchanged = self.model.revision == self.savedRevision and self.openedFile and \
+            (self.changeLog is None or not self.changeLog.lines)
+        index = SearchIndex.load(self.openedFile) if unchanged else None
+        if index is None:
+            index = SearchIndex.fromFrame(self.model.frame())
+            if unchanged:
+                try:
+                    index.save(self.openedFile)
+                except OSError:
+                    pass
+        return index
 
     @QtCore.pyqtSlot(int)
     def on_comboBox_currentIndexChanged(self, index):
         self.proxy.setFilterKeyColumn(index)
 ###############################################################################
+class dCairosWorkspace(QTabWidget):
+    # 여러 CSV 를 탭으로 나란히 연다
+    def __init__(self, parent=None):
+        super(dCairosWorkspace, self).__init__(parent)
+        self.setWindowTitle('dCairosEditor')
+        self.pool = StringPool()
+        self.savePool = QThreadPool(self)
+        self.savePool.setMaxThreadCount(1)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.tabCloseRequested.connect(self.on_tabCloseRequested)
+
+    def openFile(self, fileName=None):
+        editor = dCairosEditor(fileName=fileName, pool=self.pool, workspace=self)
+        # BaseLine/IIS.csv 와 BaseReport/IIS.csv 를 구분할 수 있게 상위 폴더 이름도 보여준다
+        directory, base = os.path.split(editor.openedFile)
+        index = self.addTab(editor, os.path.join(os.path.basename(directory), base))
+        self.setTabToolTip(index, editor.openedFile)
+        self.setCurrentIndex(index)
+        return editor
+
+    def setProfiling(self, checked):
+        # 계측기는 하나뿐이므로 한 탭에서 켜고 끄면 모든 탭의 Profile 상자와 그리기 계측을 같이 바꾼다
+        for index in range(self.count()):
+            self.widget(index).checkProfile.setChecked(checked)
+
+    @QtCore.pyqtSlot(int)
+    def on_tabCloseRequested(self, index):
+        editor = self.widget(index)
+        editor.cancelLoad()
+        editor.closeChangeLog()
+        self.removeTab(index)
+        editor.deleteLater()
+
+    def closeEvent(self, event):
+        for index in range(self.count()):
+            self.widget(index).cancelLoad()
+            self.widget(index).closeChangeLog()
+        super(dCairosWorkspace, self).closeEvent(event)
+###############################################################################
+# 계측 대상. Profile 을 켜면 시간 재는 래퍼로 바뀌고, 끄면 원래 메서드로 돌아온다
+profiler.register(PandasModel, data='data', headerData='headerData', setData='setData', sort='sort',
+                  appendFrame='appendFrame', insertRows='insertRows', removeRows='removeRows',
+                  removeRowSet='removeRowSet')
+profiler.register(CustomProxyModel, filterMask='filterMask', invalidateFilter='invalidateFilter')
+profiler.register(ColumnFilterEngine, mask='engineMask')
+profiler.register(LoadJob, run='load')
+profiler.register(SaveJob, run='save')
+profiler.register(dCairosEditor, loadFile='loadFile', resizeColumns='resizeColumns',
+                  resizeVisibleRows='resizeVisibleRows')
+###############################################################################
 if __name__ == "__main__":  # Main Application
+    # DCAIROS_PROFILE=1 이면 처음부터 계측을 켠다
+    profiler.setEnabled(os.environ.get('DCAIROS_PROFILE') == '1')
     app = QApplication(sys.argv)
-    CairosEditor = dCairosEditor()
+    CairosEditor = dCairosWorkspace()
+    for fileName in sys.argv[1:] or [None]:
+        CairosEditor.openFile(fileName)
     CairosEditor.show()
     CairosEditor.resize(1200, 800)
-    sys.exit(app.exec_())
+    status = app.exec_()
+    # 읽기, 필터 작업 스레드가 끝난 뒤에 종료한다
+    QThreadPool.globalInstance().waitForDone()
+    CairosEditor.savePool.waitForDone()
+    sys.exit(status)
 ###############################################################################
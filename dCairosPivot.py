@@ -0,0 +1,249 @@
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from PyQt5 import QtCore
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QWidget, QTableView, QPushButton, QHBoxLayout, QVBoxLayout, QFileDialog, QApplication
+from PyQt5.QtWidgets import QComboBox, QLabel
+from PyQt5.QtCore import Qt, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+from Aggregatelib import Pivot, ReportStore, SEVERITIES, UNCHECKED, hostNames
+from Compliancelib import REPORT_CODE, REPORT_ITEM, REPORT_SEVERITY
+from dCairosBatch import findInputs
+
+FIXEDCOLUMNS = [REPORT_CODE, REPORT_ITEM, REPORT_SEVERITY]
+TOTAL = '합계'
+FAILCOLOR = QColor(255, 210, 210)
+PASSCOLOR = QColor(210, 245, 210)
+# 파일이 바뀐 뒤 이만큼(ms) 조용하면 다시 집계한다 (수집기가 여러 파일을 연달아 쓰는 경우)
+REFRESHDELAY = 500
+
+
+class PivotModel(QtCore.QAbstractTableModel):
+    # 행: 항목, 열: 항목코드, 점검항목, 중요도, 호스트들, 합계. 호스트 칸은 '취약 / 양호' 행 수
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent=parent)
+        self.setPivot(Pivot(pd.DataFrame(columns=FIXEDCOLUMNS), [], np.zeros((0, 0, UNCHECKED + 1), dtype=np.int64)))
+
+    def setPivot(self, pivot):
+        # 항목과 호스트가 그대로면 숫자만 바꾸고 (선택, 스크롤 유지), 아니면 모델을 다시 만든다
+        old = getattr(self, 'pivot', None)
+        same = old is not None and old.hosts == pivot.hosts and old.items.equals(pivot.items)
+        if not same:
+            self.beginResetModel()
+        self.pivot = pivot
+        self._items = pivot.items.to_numpy(dtype=object)
+        self._totals = pivot.counts.sum(axis=1)
+        if not same:
+            self.endResetModel()
+        elif self.rowCount() > 0:
+            self.dataChanged.emit(self.index(0, len(FIXEDCOLUMNS)),
+                                  self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    def counts(self, row, column):
+        host = column - len(FIXEDCOLUMNS)
+        if host < len(self.pivot.hosts):
+            return self.pivot.counts[row, host]
+        return self._totals[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._items)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(FIXEDCOLUMNS) + len(self.pivot.hosts) + 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            if section < len(FIXEDCOLUMNS):
+                return FIXEDCOLUMNS[section]
+            host = section - len(FIXEDCOLUMNS)
+            return self.pivot.hosts[host] if host < len(self.pivot.hosts) else TOTAL
+        elif orientation == Qt.Vertical and role == Qt.DisplayRole:
+            return section
+        return QtCore.QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column < len(FIXEDCOLUMNS):
+            if role == Qt.DisplayRole:
+                return str(self._items[row, column])
+            return None
+        fail, passed, unchecked = self.counts(row, column)
+        if role == Qt.DisplayRole:
+            if fail or passed:
+                return '%d / %d' % (fail, passed)
+            return '-' if unchecked else ''
+        elif role == Qt.ToolTipRole:
+            return '취약 %d, 양호 %d, 미점검 %d' % (fail, passed, unchecked)
+        elif role == Qt.BackgroundRole:
+            if fail:
+                return FAILCOLOR
+            if passed:
+                return PASSCOLOR
+        elif role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+
+class AggregateJobSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class AggregateJob(QRunnable):
+    # 바뀐 파일만 프로세스 풀에서 읽어 집계 저장소에 반영한다
+    def __init__(self, store, fileNames, executor):
+        super().__init__()
+        self.store = store
+        self.fileNames = fileNames
+        self.executor = executor
+        self.stale = []
+        self.removed = []
+        self.error = None
+        self.signals = AggregateJobSignals()
+
+    def run(self):
+        try:
+            self.stale, self.removed = self.store.refresh(self.fileNames, self.executor)
+        except Exception as e:
+            self.error = '%s: %s' % (type(e).__name__, e)
+        finally:
+            self.signals.finished.emit(self)
+
+
+class dCairosPivot(QWidget):
+    # 여러 호스트의 BaseReport 를 항목 x 호스트 로 모아 본다
+    def __init__(self, parent=None, inputs=None):
+        super(dCairosPivot, self).__init__(parent)
+        self.setWindowTitle('dCairosPivot')
+        self.basedir = os.path.abspath(os.path.dirname(__file__))
+        self.inputs = inputs or [os.path.join(self.basedir, 'csv', 'BaseReport')]
+        self.store = ReportStore()
+        self.executor = None
+        self.job = None
+        self.pending = False
+
+        self.model = PivotModel(self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.model)
+        self.tableView.setAlternatingRowColors(True)
+        self.buttonOpen = QPushButton('Open', self)
+        self.buttonRefresh = QPushButton('Refresh', self)
+        self.comboSeverity = QComboBox(self)
+        self.comboSeverity.addItems(['All'] + SEVERITIES)
+        self.statusLabel = QLabel()
+
+        # 파일이나 디렉터리가 바뀌면 바뀐 파일만 다시 읽는다
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_watcher_changed)
+        self.watcher.directoryChanged.connect(self.on_watcher_changed)
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(REFRESHDELAY)
+        self.refreshTimer.timeout.connect(self.refresh)
+
+        self.buttonOpen.clicked.connect(self.handleOpen)
+        self.buttonRefresh.clicked.connect(self.refresh)
+        self.comboSeverity.currentIndexChanged.connect(self.on_comboSeverity_currentIndexChanged)
+
+        layout = QHBoxLayout()
+        layout.addWidget(self.buttonOpen)
+        layout.addWidget(self.buttonRefresh)
+        layout.addWidget(QLabel('중요도'))
+        layout.addWidget(self.comboSeverity)
+        layout.addWidget(self.statusLabel, 1)
+
+        Vlayout = QVBoxLayout()
+        Vlayout.addLayout(layout)
+        Vlayout.addWidget(self.tableView)
+        self.setLayout(Vlayout)
+
+        self.refresh()
+
+    def handleOpen(self):
+        directory = QFileDialog.getExistingDirectory(self)
+        if directory == '':
+            return False
+        self.inputs = [directory]
+        self.refresh()
+        return True
+
+    def refresh(self):
+        if self.job is not None:
+            # 끝나면 한 번 더 돈다
+            self.pending = True
+            return
+        self.pending = False
+        fileNames = findInputs(self.inputs)
+        self.watch(fileNames)
+        if self.executor is None:
+            # Qt 프로세스를 fork 하지 않도록 spawn 으로 띄운다
+            self.executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        self.job = AggregateJob(self.store, fileNames, self.executor)
+        self.job.signals.finished.connect(self.on_job_finished)
+        self.statusLabel.setText("Reading...")
+        QThreadPool.globalInstance().start(self.job)
+
+    def watch(self, fileNames):
+        paths = [path for path in self.inputs if os.path.isdir(path)] + fileNames
+        old = set(self.watcher.files() + self.watcher.directories())
+        added = [path for path in paths if path not in old]
+        removed = [path for path in old if path not in set(paths)]
+        if removed:
+            self.watcher.removePaths(removed)
+        if added:
+            self.watcher.addPaths(added)
+
+    @QtCore.pyqtSlot(str)
+    def on_watcher_changed(self, path):
+        self.refreshTimer.start()
+
+    @QtCore.pyqtSlot(object)
+    def on_job_finished(self, job):
+        self.job = None
+        if self.pending:
+            self.refresh()
+            return
+        self.updatePivot()
+        if job.error is not None:
+            message = "Aggregate failed: %s" % job.error
+        else:
+            message = "%d hosts, %d items (read %d, removed %d)" % (len(self.model.pivot.hosts),
+                                                                    self.model.rowCount(),
+                                                                    len(job.stale), len(job.removed))
+        if self.store.errors:
+            names = hostNames(sorted(self.store.errors))
+            message += ", %d failed: %s" % (len(self.store.errors), ', '.join(
+                names[fileName] for fileName in sorted(self.store.errors)))
+        self.statusLabel.setText(message)
+
+    def updatePivot(self):
+        if self.job is not None:
+            # 집계 중에는 저장소를 건드리지 않는다. 끝나면 on_job_finished 가 다시 그린다
+            return
+        severity = self.comboSeverity.currentText()
+        self.model.setPivot(self.store.pivot([severity] if severity in SEVERITIES else None))
+
+    @QtCore.pyqtSlot(int)
+    def on_comboSeverity_currentIndexChanged(self, index):
+        self.updatePivot()
+
+    def closeEvent(self, event):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        super(dCairosPivot, self).closeEvent(event)
+
+
+if __name__ == "__main__":  # Main Application
+    app = QApplication(sys.argv)
+    pivot = dCairosPivot(inputs=sys.argv[1:] or None)
+    pivot.show()
+    pivot.resize(1200, 800)
+    status = app.exec_()
+    QThreadPool.globalInstance().waitForDone()
+    sys.exit(status)
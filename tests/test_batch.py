@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+from CsvIOlib import CsvReader, writeCsv
+from dCairosBatch import main, outputNames
+
+
+def report(fileName, code):
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    writeCsv(fileName, ['code', 'value'], pd.DataFrame({'code': [code], 'value': ['0']}))
+
+
+def test_same_file_names_keep_their_folders(tmp_path):
+    for site in ('siteA', 'siteB'):
+        report(str(tmp_path / site / 'web01.csv'), site)
+    report(str(tmp_path / 'siteA' / 'db01.csv'), 'db')
+    output = tmp_path / 'out'
+    assert main([str(tmp_path / 'siteA'), str(tmp_path / 'siteB' / '*.csv'), str(tmp_path / 'siteA' / 'web01.csv'),
+                 '-o', str(output), '-j', '1']) == 0
+    # 이름이 겹치지 않는 파일은 그대로, 겹치는 파일은 공통 폴더 기준 상대 경로로 쓴다
+    assert sorted(os.listdir(output)) == ['db01.csv', 'siteA', 'siteB', 'summary.csv']
+    for site in ('siteA', 'siteB'):
+        assert CsvReader(str(output / site / 'web01.csv'), useCache=False).read()['code'].tolist() == [site]
+    assert len(pd.read_csv(output / 'summary.csv').index) == 3
+
+
+def test_output_names():
+    assert outputNames([]) == {}
+    names = outputNames(['a/x/r.csv', 'a/y/r.csv', 'b/s.csv'])
+    assert names == {'a/x/r.csv': os.path.join('x', 'r.csv'), 'a/y/r.csv': os.path.join('y', 'r.csv'),
+                     'b/s.csv': 's.csv'}
+
+
+def test_refuses_to_overwrite_inputs(tmp_path):
+    report(str(tmp_path / 'web01.csv'), 'web')
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), '-o', str(tmp_path)])
+    assert CsvReader(str(tmp_path / 'web01.csv'), useCache=False).read()['code'].tolist() == ['web']
@@ -0,0 +1,109 @@
+import os
+
+import pandas as pd
+from PyQt5.QtCore import Qt
+
+from ChangeLoglib import ChangeLog, JOURNAL_SUFFIX
+from CsvIOlib import CsvReader, writeCsv
+from PandasModellib import PandasModel
+
+
+def report(tmp_path):
+    fileName = str(tmp_path / 'report.csv')
+    df = pd.DataFrame({'code': ['U-03', 'U-01', 'U-02', 'U-01'], 'value': ['1', '2', '3', '4']})
+    writeCsv(fileName, ['code', 'value'], df)
+    return fileName
+
+
+def openModel(fileName):
+    return PandasModel(CsvReader(fileName, useCache=False).read())
+
+
+def test_load_drops_torn_line_and_checks_base(tmp_path):
+    fileName = report(tmp_path)
+    changeLog = ChangeLog(fileName)
+    changeLog.append({'op': 'set', 'row': 0, 'column': 1, 'value': 'a'})
+    changeLog.save()
+    changeLog.append({'op': 'set', 'row': 1, 'column': 1, 'value': 'b'})
+    changeLog.close()
+    with open(fileName + JOURNAL_SUFFIX, 'a', encoding='utf-8') as handle:
+        handle.write('{"op": "set", "row"')
+    loaded = ChangeLog.load(fileName)
+    assert [change['op'] for change in loaded.changes()] == ['set', 'save', 'set']
+    assert loaded.saved == 2 and loaded.unsaved() == 1
+    # 기준 CSV 가 바뀌면 저널은 쓰지 않는다
+    writeCsv(fileName, ['code', 'value'], pd.DataFrame({'code': ['U-09'], 'value': ['9']}))
+    assert ChangeLog.load(fileName) is None
+
+
+def test_replay_reproduces_edits_after_sort(tmp_path):
+    fileName = report(tmp_path)
+    model = openModel(fileName)
+    model.changeLog = ChangeLog(fileName)
+    model.sort(0, Qt.AscendingOrder)
+    # 정렬만으로는 저널을 만들지 않는다
+    assert not os.path.exists(fileName + JOURNAL_SUFFIX)
+    model.setData(model.index(0, 1), 'x', Qt.EditRole)
+    model.insertRows(2, 1, value='new')
+    model.sort(1, Qt.DescendingOrder)
+    model.removeRows(0, 1)
+    model.changeLog.save()
+    model.changeLog.close()
+
+    loaded = ChangeLog.load(fileName)
+    assert [change['op'] for change in loaded.changes()] == ['sort', 'set', 'insert', 'sort', 'remove', 'save']
+    replayed = openModel(fileName)
+    for change in loaded.changes():
+        replayed.applyChange(change)
+    assert replayed.frame().astype(str).equals(model.frame().astype(str))
+
+
+def test_rebase_keeps_changes_after_the_save(tmp_path):
+    fileName = report(tmp_path)
+    changeLog = ChangeLog(fileName)
+    changeLog.append({'op': 'set', 'row': 0, 'column': 1, 'value': 'a'})
+    changeLog.save()
+    count = len(changeLog.lines)
+    changeLog.append({'op': 'set', 'row': 1, 'column': 1, 'value': 'b'})
+    # CSV 를 앞의 count 줄까지 반영해 다시 썼다
+    model = openModel(fileName)
+    model.applyChange(changeLog.changes()[0])
+    writeCsv(fileName, ['code', 'value'], model.frame())
+    changeLog.rebase(fileName, count)
+    changeLog.close()
+    loaded = ChangeLog.load(fileName)
+    assert [change['value'] for change in loaded.changes()] == ['b']
+    assert loaded.saved == 0
+    # 남은 편집이 없으면 저널 파일을 지운다
+    loaded.rebase(fileName, len(loaded.lines))
+    assert not os.path.exists(fileName + JOURNAL_SUFFIX)
+
+
+def test_rebase_to_other_file_keeps_saved_changes(tmp_path):
+    fileName = report(tmp_path)
+    other = str(tmp_path / 'other.csv')
+    changeLog = ChangeLog(fileName)
+    changeLog.append({'op': 'set', 'row': 0, 'column': 1, 'value': 'a'})
+    changeLog.save()
+    changeLog.append({'op': 'set', 'row': 1, 'column': 1, 'value': 'b'})
+    writeCsv(other, ['code', 'value'], openModel(fileName).frame())
+    changeLog.rebase(other, len(changeLog.lines))
+    assert [change['op'] for change in ChangeLog.load(fileName).changes()] == ['set', 'save']
+    assert not os.path.exists(other + JOURNAL_SUFFIX)
+
+
+def test_write_failure_drops_journal_after_signals(tmp_path):
+    fileName = report(tmp_path)
+    model = openModel(fileName)
+    model.changeLog = ChangeLog(fileName)
+
+    def append(change):
+        raise OSError(28, 'No space left on device')
+    model.changeLog.append = append
+    changed, failed = [], []
+    model.dataChanged.connect(lambda topLeft, bottomRight: changed.append(topLeft.row()))
+    model.journalFailed.connect(failed.append)
+    assert model.setData(model.index(2, 1), 'x', Qt.EditRole)
+    assert changed == [2] and len(failed) == 1
+    assert model.changeLog is None
+    assert model.cellText(2, 1) == 'x'
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from Compliancelib import BASELINE_CODE, BASELINE_COMPARE, BASELINE_DATA, BASELINE_NAME
+from Compliancelib import REPORT_CODE, REPORT_NAME, REPORT_RESULT, REPORT_VALUE, PASS, FAIL
+from Compliancelib import BASELINE_COLUMNS, REPORT_COLUMNS
+from Compliancelib import applyCompliance, checkReport, evaluate, missingColumns, normalizeRules
+
+
+def baseline(rows):
+    return pd.DataFrame(rows, columns=[BASELINE_NAME, BASELINE_COMPARE, BASELINE_DATA, BASELINE_CODE])
+
+
+def report(rows):
+    return pd.DataFrame(rows, columns=[REPORT_CODE, REPORT_NAME, REPORT_VALUE, REPORT_RESULT])
+
+
+def test_evaluate_operators():
+    values = ['5', '5', '5', '5', '5', '5', 'No', 'yes', 'abc', '']
+    ops = ['==', '!=', '<=', '>=', '<', '>', '==', '!=', '<=', '==']
+    data = ['5.0', '5', '6', '6', '5', '4', 'no', 'YES', '5', '5']
+    result = evaluate(values, ops, data)
+    np.testing.assert_array_equal(result[:8], [1, 0, 1, 0, 0, 1, 1, 0])
+    # 숫자가 아닌 값의 대소 비교와 빈 값은 판단하지 않는다
+    assert np.isnan(result[8]) and np.isnan(result[9])
+
+
+def test_normalize_rules_suffix():
+    rules = normalizeRules(baseline([
+        ['Dery', '', '5 이하', 'U-01'],
+        ['minlen', '', '8이상', 'U-02'],
+        ['PermitRootLogin', '=', ' No ', 'U-03'],
+        ['x', '미만', '3', 'U-04'],
+    ]))
+    assert rules['op'].tolist() == ['<=', '>=', '==', '<']
+    assert rules['data'].tolist() == ['5', '8', 'no', '3']
+    assert rules['name'].tolist() == ['dery', 'minlen', 'permitrootlogin', 'x']
+
+
+def test_check_report_by_name_and_code_fallback():
+    rules = baseline([
+        ['PermitRootLogin', '==', 'no', 'U-01'],
+        ['minlen', '>=', '8', 'U-02'],
+        ['maxrepeat', '<=', '3', 'U-02'],
+        ['Dery', '', '5 이하', 'U-03'],
+    ])
+    rows = report([
+        ['U-01', 'PermitRootLogin', 'no', None],
+        ['U-01', 'PermitRootLogin', 'yes', None],
+        ['U-02', 'minlen', '6', None],
+        ['U-02', 'maxrepeat', '2', None],
+        # 항목코드에 규칙이 여럿이면 이름이 달라서는 붙일 규칙을 고를 수 없다
+        ['U-02', 'other', '1', None],
+        # 규칙이 하나뿐인 항목코드는 설정이름이 달라도 그 규칙으로 판단한다
+        ['U-03', 'deny', '4', None],
+        ['U-03', 'deny', '', None],
+        ['U-99', 'PermitRootLogin', 'no', None],
+    ])
+    result = checkReport(rows, rules)
+    assert result.fillna('').tolist() == [PASS, FAIL, FAIL, PASS, '', PASS, '', '']
+    assert result.name == REPORT_RESULT
+
+
+def test_apply_compliance_keeps_unknown_results():
+    rules = baseline([['minlen', '>=', '8', 'U-02']])
+    rows = report([
+        ['U-02', 'minlen', '9', FAIL],
+        ['U-02', 'minlen', '', FAIL],
+        ['U-05', 'x', '1', PASS],
+    ])
+    column, filled = applyCompliance(rows, rules)
+    assert column.tolist() == [PASS, FAIL, PASS]
+    assert filled.tolist() == [True, False, False]
+
+
+def test_missing_columns():
+    assert missingColumns(report([]), REPORT_COLUMNS) == []
+    assert missingColumns(baseline([]), BASELINE_COLUMNS) == []
+    assert missingColumns(report([]).drop(columns=[REPORT_VALUE]), REPORT_COLUMNS) == [REPORT_VALUE]
+    assert missingColumns(pd.DataFrame(columns=['foo']), BASELINE_COLUMNS) == BASELINE_COLUMNS
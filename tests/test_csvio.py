@@ -0,0 +1,90 @@
+import os
+import shutil
+
+import pandas as pd
+
+from CsvIOlib import CACHE_SUFFIX, CsvReader, SidecarCache, writeCsv
+
+
+def mixedReport(tmp_path, rows=50):
+    # 앞쪽 청크는 숫자만, 뒤쪽 청크에는 빈 값과 문자열이 섞인 열
+    fileName = str(tmp_path / 'mixed.csv')
+    values = [str(row % 7) for row in range(rows)]
+    values[30] = ''
+    values[40] = 'NoData'
+    df = pd.DataFrame({'code': ['U-%02d' % row for row in range(rows)], 'value': values,
+                       'padded': ['007'] * rows, 'ratio': ['1.50'] * rows})
+    writeCsv(fileName, list(df.columns), df)
+    return fileName
+
+
+def test_chunks_keep_text_as_written(tmp_path):
+    fileName = mixedReport(tmp_path)
+    frames = list(CsvReader(fileName, chunksize=4, useCache=False).chunks())
+    assert len(frames) > 2
+    df = pd.concat(frames)
+    assert df['value'].iloc[0] == '0' and df['value'].iloc[8] == '1'
+    assert pd.isna(df['value'].iloc[30]) and df['value'].iloc[40] == 'NoData'
+    assert (df['padded'] == '007').all() and (df['ratio'] == '1.50').all()
+
+
+def test_load_and_save_round_trip(tmp_path):
+    fileName = mixedReport(tmp_path)
+    with open(fileName, 'rb') as handle:
+        original = handle.read()
+    # 처음에는 CSV 에서 읽으며 캐시를 만들고, 두 번째는 캐시에서 읽는다
+    copy = str(tmp_path / 'copy.csv')
+    for _ in range(2):
+        reader = CsvReader(fileName, chunksize=4)
+        df = reader.read()
+        writeCsv(copy, reader.header, df)
+        with open(copy, 'rb') as handle:
+            assert handle.read() == original
+
+
+def test_cache_follows_csv_changes(tmp_path):
+    fileName = mixedReport(tmp_path)
+    CsvReader(fileName, chunksize=4).read()
+    assert SidecarCache(fileName).isValid()
+    # CSV 를 바꾸면 캐시는 버려지고 새 내용을 읽는다
+    df = pd.DataFrame({'code': ['U-99'], 'value': ['x'], 'padded': ['1'], 'ratio': ['2']})
+    writeCsv(fileName, list(df.columns), df)
+    assert not SidecarCache(fileName).isValid()
+    assert not os.path.exists(fileName + CACHE_SUFFIX)
+    assert CsvReader(fileName).read()['code'].tolist() == ['U-99']
+    assert SidecarCache(fileName).isValid()
+    # 내용이 같아도 수정 시각이 바뀌면 다시 읽는다
+    stat = os.stat(fileName)
+    os.utime(fileName, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert not SidecarCache(fileName).isValid()
+
+
+def test_cache_swapped_while_reading_falls_back_to_csv(tmp_path):
+    fileName = mixedReport(tmp_path)
+    expected = CsvReader(fileName, chunksize=4, useCache=False).read()
+    CsvReader(fileName, chunksize=4).read()
+    reader = CsvReader(fileName, chunksize=4)
+    chunks = reader.chunks()
+    frames = [next(chunks)]
+    # 다른 작업자가 캐시를 지우고 바꾸는 중이면 이미 받은 행 뒤부터 CSV 에서 이어 읽는다
+    shutil.rmtree(fileName + CACHE_SUFFIX)
+    frames.extend(chunks)
+    # 캐시에서 읽은 앞 청크는 범주형이므로 값만 비교한다
+    df = pd.concat(frames)
+    assert len(frames) > 1
+    pd.testing.assert_frame_equal(df.astype(object), expected.astype(object))
+
+
+def test_cache_reopens_text_as_shared_categories(tmp_path):
+    fileName = mixedReport(tmp_path)
+    expected = CsvReader(fileName, chunksize=4, useCache=False).read()
+    CsvReader(fileName, chunksize=4).read()
+    frames = list(CsvReader(fileName, chunksize=4).chunks())
+    assert len(frames) > 2
+    # 청크마다 같은 범주 dtype 이라 이어 붙여도 범주형으로 남는다
+    for column in range(len(expected.columns)):
+        dtypes = {frame.dtypes.iloc[column] for frame in frames}
+        assert len(dtypes) == 1 and isinstance(dtypes.pop(), pd.CategoricalDtype)
+    df = pd.concat(frames)
+    assert isinstance(df['value'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df.astype(object), expected.astype(object))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from FilterEnginelib import ColumnFilterEngine, frameMask, toText
+
+
+def engineFor(df, expresions):
+    engine = ColumnFilterEngine()
+    for column, expresion in expresions.items():
+        engine.setFilter(expresion, column)
+    return engine
+
+
+def mask(engine, df):
+    def columnText(column, first=None, last=None):
+        text = toText(df.iloc[:, column])
+        return text if first is None else text[first:last + 1]
+    return engine.mask(columnText, len(df.index))
+
+
+def same(engine, df, expresions):
+    # 고쳐 쓴 마스크와 처음부터 계산한 마스크가 같아야 한다
+    assert mask(engine, df).tolist() == frameMask(df, expresions).tolist()
+
+
+def frame():
+    return pd.DataFrame({'code': ['U-%02d' % row for row in range(10)],
+                         'level': ['상', '중', '하', '상', '중', '상', '하', '상', '중', '상']})
+
+
+def test_stale_ranges_are_recomputed():
+    df = frame()
+    expresions = {0: 'U-0', 1: '^상$'}
+    engine = engineFor(df, expresions)
+    same(engine, df, expresions)
+    # 흩어진 여러 범위를 고친 뒤 한 번에 다시 계산한다
+    df.iloc[[1, 2], 1] = '상'
+    df.iloc[7, 1] = '하'
+    df.iloc[9, 0] = 'U-00'
+    engine.invalidate([1], 1, 2)
+    engine.invalidate([1], 7, 7)
+    engine.invalidate([0, 1], 9, 9)
+    same(engine, df, expresions)
+    # 잘못된 정규식은 어떤 행과도 맞지 않는다
+    engine.setFilter('(', 0)
+    assert not mask(engine, df).any()
+
+
+def test_masks_follow_row_changes():
+    df = frame()
+    expresions = {1: '상|하'}
+    engine = engineFor(df, expresions)
+    same(engine, df, expresions)
+    rows = pd.DataFrame({'code': ['N-1', 'N-2'], 'level': ['하', '중']})
+    df = pd.concat([df.iloc[:3], rows, df.iloc[3:]], ignore_index=True)
+    engine.insertRows(3, 4)
+    # 아직 계산하지 않은 편집 범위가 있어도 행 번호를 따라 옮긴다
+    df.iloc[8, 1] = '상'
+    engine.invalidate([1], 8, 8)
+    engine.removeRows(0, 1)
+    df = df.iloc[2:].reset_index(drop=True)
+    same(engine, df, expresions)
+    df.iloc[0, 1] = '중'
+    engine.invalidate([1], 0, 0)
+    keep = np.ones(len(df.index), dtype=bool)
+    keep[[1, 4]] = False
+    engine.keepRows(keep)
+    df = df[keep].reset_index(drop=True)
+    same(engine, df, expresions)
+    order = np.arange(len(df.index))[::-1]
+    engine.permute(order)
+    df = df.iloc[order].reset_index(drop=True)
+    same(engine, df, expresions)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from Compliancelib import REPORT_CODE, REPORT_NAME, REPORT_VALUE
+from FrameDifflib import diffFrames
+
+
+def frame(rows, columns=(REPORT_CODE, REPORT_NAME, REPORT_VALUE)):
+    return pd.DataFrame(rows, columns=list(columns))
+
+
+def test_duplicate_keys_match_by_occurrence():
+    # 한 항목코드에 설정이 여럿인 보고서
+    old = frame([['U-01', 'minlen', '8'],
+                 ['U-01', 'maxrepeat', '3'],
+                 ['U-02', 'Dery', '5'],
+                 ['U-01', 'lcredit', '1']])
+    new = frame([['U-01', 'minlen', '8'],
+                 ['U-01', 'maxrepeat', '4'],
+                 ['U-01', 'lcredit', '1'],
+                 ['U-03', 'x', '0']])
+    diff = diffFrames(old, new)
+    assert diff.removed.tolist() == [2]
+    assert diff.changed.tolist() == [1] and diff.changedNew.tolist() == [1]
+    assert diff.columns == [2]
+    assert diff.added.tolist() == [3]
+    assert diff.newRows.tolist() == [0, 1, -1, 2]
+
+
+def test_identical_rows_keep_their_pairs_when_rows_move():
+    old = frame([['U-01', 'a', '1'], ['U-01', 'b', '2'], ['U-02', 'c', '3']])
+    new = frame([['U-02', 'c', '3'], ['U-01', 'b', '2'], ['U-01', 'a', '1']])
+    diff = diffFrames(old, new)
+    assert len(diff.changed) == 0 and len(diff.removed) == 0 and len(diff.added) == 0
+    assert diff.newRows.tolist() == [2, 1, 0]
+
+
+def test_without_key_column_rows_match_by_position():
+    old = frame([['a', '1'], ['b', '2'], ['c', '3']], columns=['name', 'value'])
+    new = frame([['a', '1'], ['b', '9']], columns=['name', 'value'])
+    diff = diffFrames(old, new)
+    assert diff.changed.tolist() == [1] and diff.columns == [1]
+    assert diff.removed.tolist() == [2]
+    assert len(diff.added) == 0
+
+
+def test_missing_values_compare_as_text():
+    old = frame([['U-01', 'a', np.nan]])
+    new = frame([['U-01', 'a', np.nan]])
+    diff = diffFrames(old, new)
+    assert len(diff.changed) == 0 and diff.newRows.tolist() == [0]
+
+
+def test_column_change_needs_full_reload():
+    old = frame([['U-01', 'a', '1']])
+    new = frame([['U-01', 'a', '1']], columns=[REPORT_CODE, REPORT_NAME, '설정'])
+    assert diffFrames(old, new) is None
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QPersistentModelIndex, Qt
+
+import PandasModellib
+from ChangeLoglib import ChangeLog
+from CsvIOlib import CsvReader, writeCsv
+from PandasModellib import PandasModel
+
+
+def frame(rows=8):
+    return pd.DataFrame({'code': ['U-%02d' % row for row in range(rows)], 'value': [str(row) for row in range(rows)]})
+
+
+def texts(model, column=0):
+    return [model.cellText(row, column) for row in range(model.rowCount())]
+
+
+def test_edits_change_row_permutation_only():
+    model = PandasModel(frame())
+    model.insertRows(2, 2, value='new')
+    model.removeRows(0, 1)
+    model.setData(model.index(0, 1), 'x', Qt.EditRole)
+    assert model.removeRowSet([1, 3, 5])
+    expected = ['U-01', 'new', 'U-03', 'U-05', 'U-06', 'U-07']
+    assert texts(model) == expected and model.columnText(0).tolist() == expected
+    assert texts(model, 1) == ['x', 'new', '3', '5', '6', '7']
+    # 물리 저장소는 뒤에 붙기만 하고 지운 행도 compact 전까지 남아 있다
+    assert len(model._data.index) > 8 and model._size == 10 and len(model._rows) == 6
+    df = model.frame()
+    assert model._rows.tolist() == list(range(6)) and model._size == 6
+    assert df['code'].tolist() == expected
+
+
+def test_remove_row_set_matches_block_removals():
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(200, 60, replace=False))
+    model, blocks = PandasModel(frame(200)), PandasModel(frame(200))
+    model.sort(1, Qt.DescendingOrder)
+    blocks.sort(1, Qt.DescendingOrder)
+    kept = QPersistentModelIndex(model.index(int(np.setdiff1d(np.arange(200), rows)[-1]), 0))
+    removed = QPersistentModelIndex(model.index(int(rows[0]), 0))
+    text = kept.data()
+    assert model.removeRowSet(rows[::-1])
+    for row in rows[::-1]:
+        blocks.removeRows(int(row), 1)
+    assert texts(model) == texts(blocks)
+    # 영구 인덱스: 남은 행은 따라가고 지운 행은 무효가 된다
+    assert kept.isValid() and kept.data() == text and not removed.isValid()
+    assert not model.removeRowSet([140]) and not model.removeRowSet([])
+
+
+def test_compacts_when_deleted_rows_outnumber_kept(monkeypatch):
+    monkeypatch.setattr(PandasModellib, 'COMPACTSIZE', 0)
+    model = PandasModel(frame())
+    model.removeRowSet([1, 3, 5, 7])
+    assert model._size == 8
+    model.removeRowSet([0])
+    assert model._size == 3 and model._rows.tolist() == [0, 1, 2]
+    assert texts(model) == ['U-02', 'U-04', 'U-06']
+
+
+def test_delete_replays_after_sort(tmp_path):
+    fileName = str(tmp_path / 'report.csv')
+    writeCsv(fileName, ['code', 'value'], frame())
+    model = PandasModel(CsvReader(fileName, useCache=False).read())
+    model.changeLog = ChangeLog(fileName)
+    model.sort(1, Qt.DescendingOrder)
+    model.removeRowSet([0, 2, 3])
+    model.changeLog.save()
+    model.changeLog.close()
+    changes = ChangeLog.load(fileName).changes()
+    assert [change['op'] for change in changes] == ['sort', 'delete', 'save']
+    replayed = PandasModel(CsvReader(fileName, useCache=False).read())
+    for change in changes:
+        replayed.applyChange(change)
+    assert texts(replayed) == texts(model) == ['U-06', 'U-03', 'U-02', 'U-01', 'U-00']
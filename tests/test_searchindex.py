@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from CsvIOlib import writeCsv
+from FilterEnginelib import toText
+from SearchIndexlib import INDEX_SUFFIX, SearchIndex
+
+
+def frame():
+    return pd.DataFrame({'code': ['U-01', 'U-02', 'U-03', 'U-04'],
+                         'name': ['root 계정 원격 접속', '패스워드 복잡성', '계정 잠금', 'Finger 서비스'],
+                         'value': ['no', '8', '5', 'NoData']})
+
+
+def same(index, df, queries=('계정', 'u-0', 'no', '서비스', 'x')):
+    # 고친 색인과 새로 만든 색인이 같은 행을 찾아야 한다
+    fresh = SearchIndex.fromFrame(df)
+    for query in queries:
+        assert index.search(query).tolist() == fresh.search(query).tolist(), query
+        assert index.searchKeywords(query).tolist() == fresh.searchKeywords(query).tolist(), query
+
+
+def test_search_substring_and_keywords():
+    index = SearchIndex.fromFrame(frame())
+    assert index.search('계정').tolist() == [0, 2]
+    assert index.search('NODATA').tolist() == [3]
+    # 키워드는 토큰의 앞부분으로 찾고, 여러 키워드는 모두 들어 있어야 한다
+    assert index.searchKeywords('계 원격').tolist() == [0]
+    assert index.searchKeywords('잠금 없는말').tolist() == []
+
+
+def test_postings_follow_edits():
+    df = frame()
+    index = SearchIndex.fromFrame(df)
+    index.search('계정')
+    # 셀 수정
+    df.iloc[[1, 3], 1] = ['계정 패스워드', '텔넷']
+    index.setCells(1, np.array([1, 3]), toText(df.iloc[[1, 3], 1]))
+    same(index, df)
+    # 행 삽입
+    rows = pd.DataFrame({'code': ['U-05'], 'name': ['계정 관리'], 'value': ['no']})
+    df = pd.concat([df.iloc[:2], rows, df.iloc[2:]], ignore_index=True)
+    index.insertRows(2, [toText(rows.iloc[:, column]) for column in range(len(rows.columns))])
+    same(index, df)
+    # 행 삭제
+    index.removeRows(0, 0)
+    df = df.iloc[1:].reset_index(drop=True)
+    same(index, df)
+    keep = np.array([True, False, True, True])
+    index.keepRows(keep)
+    df = df[keep].reset_index(drop=True)
+    same(index, df)
+    # 정렬
+    order = np.array([2, 0, 1])
+    index.permute(order)
+    df = df.iloc[order].reset_index(drop=True)
+    same(index, df)
+
+
+def test_save_and_load(tmp_path):
+    fileName = str(tmp_path / 'report.csv')
+    df = frame()
+    writeCsv(fileName, list(df.columns), df)
+    SearchIndex.fromFrame(df).save(fileName)
+    index = SearchIndex.load(fileName)
+    same(index, df)
+    # CSV 가 바뀌면 저장된 색인은 쓰지 않는다
+    writeCsv(fileName, list(df.columns), df.iloc[:2])
+    assert SearchIndex.load(fileName) is None
+    (tmp_path / ('report.csv' + INDEX_SUFFIX)).write_bytes(b'broken')
+    assert SearchIndex.load(fileName) is None
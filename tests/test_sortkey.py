@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt
+
+from PandasModellib import PandasModel
+from SortKeylib import columnRanks, naturalKeys
+
+
+def ordered(values):
+    return [values[row] for row in np.argsort(columnRanks(values), kind='stable')]
+
+
+def test_natural_keys_compare_numbers_by_value():
+    keys = naturalKeys(['U-10', 'U-2', 'u-1', 'U-02b'])
+    assert list(np.argsort(keys, kind='stable')) == [2, 1, 3, 0]
+
+
+def test_ranks_put_numbers_first_and_empty_last():
+    values = ['U-10', '10', np.nan, '9', 'U-9', '-1.5', ' 2 ', 'NoData', '1e1x']
+    assert ordered(values)[:4] == ['-1.5', ' 2 ', '9', '10']
+    assert ordered(values)[4:-1] == ['1e1x', 'NoData', 'U-9', 'U-10']
+    assert pd.isna(ordered(values)[-1])
+    # 같은 값은 같은 순위
+    ranks = columnRanks(['b', 'a', 'b', None])
+    assert ranks[0] == ranks[2] and ranks[1] < ranks[0] < ranks[3]
+    numbers = columnRanks(pd.Series([3.0, np.nan, -1.0, 3.0]))
+    assert numbers.tolist() == [1, 2, 0, 1]
+
+
+def test_sort_is_stable_and_keeps_empty_values_last():
+    df = pd.DataFrame({'level': ['상', np.nan, '중', '상', np.nan, '중'],
+                       'code': ['U-10', 'U-1', 'U-2', 'U-9', 'U-3', 'U-1']})
+    model = PandasModel(df)
+
+    def column(number):
+        return [model.cellText(row, number) for row in range(model.rowCount())]
+    model.sort(1, Qt.AscendingOrder)
+    assert column(1) == ['U-1', 'U-1', 'U-2', 'U-3', 'U-9', 'U-10']
+    # 같은 값은 이전 정렬 순서를 지키고 빈 값은 내림차순에서도 맨 뒤에 온다
+    model.sort(0, Qt.DescendingOrder)
+    assert column(0) == ['중', '중', '상', '상', 'nan', 'nan']
+    assert column(1) == ['U-1', 'U-2', 'U-9', 'U-10', 'U-1', 'U-3']
+    model.sort(0, Qt.AscendingOrder)
+    assert column(1) == ['U-9', 'U-10', 'U-1', 'U-2', 'U-1', 'U-3']
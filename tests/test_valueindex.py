@@ -0,0 +1,42 @@
+import numpy as np
+
+from ValueIndexlib import ColumnValues
+
+
+def same(values, texts):
+    # 고친 색인과 새로 만든 색인의 고유값별 행 수가 같아야 한다
+    items, counts = values.items()
+    fresh, freshCounts = ColumnValues(texts).items()
+    assert items.tolist() == fresh.tolist() and counts.tolist() == freshCounts.tolist()
+    assert [values.values[code] for code in values.codes] == list(texts)
+
+
+def test_counts_follow_edits_and_deletes():
+    texts = np.array(['상', '중', '상', 'nan', 'U-10', 'U-2'], dtype=object)
+    values = ColumnValues(texts)
+    assert values.items()[0].tolist() == ['nan', 'U-2', 'U-10', '상', '중']
+    values.setCells(np.array([1, 4]), np.array(['상', '하'], dtype=object))
+    texts[[1, 4]] = ['상', '하']
+    same(values, texts)
+    values.insertRows(2, np.array(['중', '신규'], dtype=object))
+    texts = np.insert(texts, 2, ['중', '신규'])
+    same(values, texts)
+    values.removeRows(0, 1)
+    texts = texts[2:]
+    same(values, texts)
+    keep = np.array([True, False, True, True, False, True])
+    values.keepRows(keep)
+    texts = texts[keep]
+    same(values, texts)
+    order = np.array([3, 1, 0, 2])
+    values.permute(order)
+    texts = texts[order]
+    same(values, texts)
+    # 행이 모두 없어진 값은 목록에서 빠진다
+    assert '하' not in values.items()[0].tolist()
+
+
+def test_mask_and_rows():
+    values = ColumnValues(np.array(['a', 'b', 'a', 'c'], dtype=object))
+    assert values.mask(['a', 'c', 'missing']).tolist() == [True, False, True, True]
+    assert values.rows('a').tolist() == [0, 2] and values.rows('missing').tolist() == []